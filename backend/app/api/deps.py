@@ -3,24 +3,44 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.auth.firebase import verify_bearer_token
 from app.core.db import get_db
+from app.core.metrics import phase
+from app.services.stream_tickets import redeem_stream_ticket
 
 
 def db_dep() -> AsyncIOMotorDatabase:
     return get_db()
 
 
+def _verify(token: str) -> dict:
+    try:
+        with phase("auth"):
+            return verify_bearer_token(token)
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
 def current_user(request: Request) -> dict:
     auth_header = request.headers.get("authorization") or ""
     if not auth_header.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Missing bearer token")
 
-    token = auth_header.split(" ", 1)[1].strip()
-    try:
-        return verify_bearer_token(token)
-    except Exception:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    return _verify(auth_header.split(" ", 1)[1].strip())
+
+
+async def stream_user_id(
+    request: Request, ticket: str | None = None, db: AsyncIOMotorDatabase = Depends(db_dep)
+) -> str:
+    # Browser EventSource cannot send headers, so streams also accept a single-use
+    # ticket from POST /events/ticket as ?ticket=; the ID token never goes in a URL.
+    if request.headers.get("authorization") or not ticket:
+        return current_user(request)["uid"]
+    user_id = await redeem_stream_ticket(db, ticket)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid ticket")
+    return user_id
 
 
 CurrentUser = Depends(current_user)
+StreamUserId = Depends(stream_user_id)
 DB = Depends(db_dep)
 
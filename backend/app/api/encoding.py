@@ -0,0 +1,145 @@
+import functools
+import types
+from typing import Any, Union, get_args, get_origin
+
+import orjson
+from bson import ObjectId
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.metrics import phase
+
+
+def _default(value: Any) -> Any:
+    # Types orjson does not handle natively.
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"cannot encode {type(value).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON for API payloads, straight from BSON-typed values."""
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_bytes(obj: Any) -> bytes:
+    with phase("serialize"):
+        return dumps(obj)
+
+
+class JSONBytesResponse(JSONResponse):
+    # The app's default response class, so routes that return plain data share the codec.
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
+
+
+_MISSING = object()
+
+
+def _nested_model(annotation: Any) -> tuple[type[BaseModel] | None, bool]:
+    # (model, is_list) for `M`, `M | None` and `list[M]` fields; (None, False) otherwise.
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        return _nested_model(args[0]) if len(args) == 1 else (None, False)
+    if origin is list:
+        (item,) = get_args(annotation) or (Any,)
+        model, _ = _nested_model(item)
+        return model, model is not None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+class ModelEncoder:
+    """A response model's fields, resolved once, for shaping trusted service dicts.
+
+    The service layer already produces valid values, so this only picks the
+    model's fields (filling defaults, and `id` from a raw `_id`) instead of
+    validating the dict again the way response_model does.
+    """
+
+    def __init__(self, model: type[BaseModel]):
+        self.model = model
+        self.fields: list[tuple[str, Any, ModelEncoder | None, bool]] = []
+        for name, info in model.model_fields.items():
+            nested, many = _nested_model(info.annotation)
+            default = None if info.is_required() else info.get_default(call_default_factory=True)
+            self.fields.append((name, default, encoder_for(nested) if nested else None, many))
+
+    def shape(self, doc: dict[str, Any]) -> dict[str, Any]:
+        out = {}
+        for name, default, nested, many in self.fields:
+            value = doc.get(name, _MISSING)
+            if value is _MISSING:
+                value = doc.get("_id", default) if name == "id" else default
+            elif nested is not None and value is not None:
+                value = [nested.shape(v) for v in value] if many else nested.shape(value)
+            out[name] = value
+        return out
+
+
+@functools.cache
+def encoder_for(model: type[BaseModel]) -> ModelEncoder:
+    return ModelEncoder(model)
+
+
+def model_response(
+    model: type[BaseModel],
+    content: dict[str, Any] | list[dict[str, Any]],
+    headers: dict[str, str] | None = None,
+    status_code: int = 200,
+) -> Response:
+    """A JSON response in `model`'s shape (a list of them for list content), skipping validation.
+
+    Keep response_model on the route for the schema; returning this bypasses it.
+    """
+    encoder = encoder_for(model)
+    with phase("serialize"):
+        shaped = [encoder.shape(d) for d in content] if isinstance(content, list) else encoder.shape(content)
+        body = dumps(shaped)
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def accepted_encodings(request: Request) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for part in (request.headers.get("accept-encoding") or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def pick_encoding(request: Request, available: dict[str, bytes]) -> str | None:
+    accepted = accepted_encodings(request)
+    # Prefer brotli over gzip when the client accepts both equally.
+    for name in ("br", "gzip"):
+        if name in available and accepted.get(name, accepted.get("*", 0.0)) > 0:
+            return name
+    return None
+
+
+def encoded_response(
+    request: Request,
+    body: bytes,
+    encoded: dict[str, bytes],
+    media_type: str = "application/json",
+    headers: dict[str, str] | None = None,
+) -> Response:
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    encoding = pick_encoding(request, encoded)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        body = encoded[encoding]
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,55 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    RequestTimings,
+    current_timings,
+    http_duration,
+    http_mongo_commands,
+    http_phase_duration,
+    http_requests,
+)
+
+
+class InstrumentationMiddleware:
+    """Times each request, adds a Server-Timing header and feeds the /metrics histograms."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status = 500
+        streaming = False
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing())
+                streaming = headers.get("content-type", "").startswith("text/event-stream")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            elapsed = time.perf_counter() - timings.started
+            route = getattr(scope.get("route"), "path", None) or "(unmatched)"
+            method = scope["method"]
+            http_requests.inc((method, route, str(status)))
+            if not streaming:
+                # An event stream's duration is how long the client stayed connected.
+                http_duration.observe((method, route), elapsed)
+            http_mongo_commands.observe((route,), timings.mongo_commands)
+            http_phase_duration.observe((route, "db"), timings.mongo_seconds)
+            for name, seconds in timings.phases.items():
+                http_phase_duration.observe((route, name), seconds)
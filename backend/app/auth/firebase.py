@@ -1,11 +1,20 @@
 import json
+import logging
 
 import firebase_admin
 from firebase_admin import auth as firebase_auth
 from firebase_admin import credentials
 
+from app.auth.token_cache import TokenCache
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+token_cache = TokenCache(maxsize=settings.auth_token_cache_size)
+
+# Google's published signing certificates for Firebase ID tokens.
+ID_TOKEN_CERT_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
 
 def init_firebase() -> None:
     if firebase_admin._apps:
@@ -31,7 +40,36 @@ def init_firebase() -> None:
     firebase_admin.initialize_app(options={"projectId": settings.firebase_project_id})
 
 
+def warm_up() -> None:
+    """Initializes Firebase and fetches the ID-token signing keys.
+
+    verify_id_token reads the keys through the auth client's HTTP cache, so
+    doing this at startup keeps the fetch off the first request. Best effort:
+    a failure is logged and the first verification fetches them instead.
+    """
+    try:
+        init_firebase()
+    except Exception:
+        logger.exception("firebase warm-up failed")
+        return
+    try:
+        # firebase-admin exposes no way to prime that cache, so this reaches into
+        # the auth client it keeps per app. It matches the firebase-admin version
+        # pinned in pyproject.toml; should a release move it, only the warm-up is lost.
+        verifier = firebase_auth._get_client(None)._token_verifier
+        verifier.request(ID_TOKEN_CERT_URL)
+    except AttributeError:
+        logger.warning("firebase-admin internals changed; signing keys are fetched on first use")
+    except Exception:
+        logger.exception("firebase signing key prefetch failed")
+
+
 def verify_bearer_token(token: str) -> dict:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     init_firebase()
-    return firebase_auth.verify_id_token(token)
+    decoded = firebase_auth.verify_id_token(token)
+    token_cache.put(token, decoded)
+    return decoded
 
@@ -0,0 +1,80 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """Bounded LRU of decoded ID token claims, keyed by a hash of the raw token.
+
+    Entries are dropped once the token's `exp` passes, so a cached token is never
+    accepted for longer than Firebase itself would accept it.
+    """
+
+    def __init__(self, maxsize: int = 10_000, leeway_seconds: int = 0):
+        self.maxsize = maxsize
+        self.leeway_seconds = leeway_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> dict | None:
+        k = self.key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at <= now:
+                del self._entries[k]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(k)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        expires_at = float(exp) - self.leeway_seconds
+        if expires_at <= time.time():
+            return
+        k = self.key(token)
+        with self._lock:
+            self._entries[k] = (expires_at, claims)
+            self._entries.move_to_end(k)
+            if len(self._entries) > self.maxsize:
+                self._evict_expired(time.time())
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _evict_expired(self, now: float) -> None:
+        for k in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[k]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,10 +8,82 @@ class Settings(BaseSettings):
 
     mongodb_url: str = "mongodb://mongodb:27017"
     mongodb_db: str = "vibe_tracker"
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_max_idle_time_ms: int | None = None
+    mongodb_wait_queue_timeout_ms: int | None = None
+    # Comma-separated, in preference order: zstd, snappy, zlib.
+    mongodb_compressors: str = ""
+    # Used by read-only service calls only; writes and read-after-write stay on the primary.
+    mongodb_read_preference: Literal["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"] = (
+        "primary"
+    )
+    # Bounded staleness for non-primary reads; MongoDB requires at least 90 seconds.
+    mongodb_max_staleness_seconds: int | None = None
+    # "startup" has each worker compare the stored index version in the background and
+    # build only when it is behind; "off" leaves it to `python -m app.migrations.indexes`.
+    index_migration: Literal["startup", "off"] = "startup"
     cors_origins: str = "http://localhost:5173"
 
     firebase_project_id: str | None = None
     firebase_service_account_json: str | None = None
+    auth_token_cache_size: int = 10_000
+    # How long startup waits for Firebase init and the signing-key fetch; 0 skips the warm-up.
+    firebase_warmup_timeout_seconds: float = 10.0
+
+    # How often template files are checked for changes; 0 loads them once.
+    steps_reload_interval_seconds: float = 5.0
+
+    # "local" is a per-process LRU; "redis" shares views between workers; "memory" is an in-process stand-in for it.
+    project_cache_backend: Literal["local", "redis", "memory", "none"] = "local"
+    project_cache_size: int = 2048
+    project_cache_ttl_seconds: float = 30.0
+    project_cache_redis_url: str | None = None
+
+    # Layout for new projects: one step_progress document per step, or a step map
+    # embedded in the project. Existing projects move with app.migrations.project_storage.
+    project_storage: Literal["documents", "embedded"] = "documents"
+
+    reminder_dispatcher_enabled: bool = True
+    reminder_sender: str = "log"
+    reminder_batch_size: int = 100
+    reminder_claim_ttl_seconds: float = 300.0
+    reminder_max_idle_seconds: float = 60.0
+    # Sent reminders older than this are removed by the purger, which leaves a
+    # sync tombstone for each so delta-sync clients drop them too.
+    reminder_retention_days: int = 90
+
+    purge_interval_seconds: float = 300.0
+    purge_batch_size: int = 500
+
+    # /api/metrics sits on the public API, so it is off unless enabled. With a token
+    # set, scrapers must send it as "Authorization: Bearer <token>".
+    metrics_enabled: bool = False
+    metrics_token: str | None = None
+
+    # "local" fans events out inside this process; "change_stream" relays them through
+    # MongoDB (replica set required) so subscribers on every worker see every write.
+    events_backend: Literal["local", "change_stream"] = "local"
+    events_queue_size: int = 100
+    events_heartbeat_seconds: float = 15.0
+    events_retention_seconds: int = 3600
+    # Lifetime of the single-use tickets browsers open the event stream with.
+    events_ticket_ttl_seconds: float = 60.0
+
+    # GET /sync reports deletions this far back; older watermarks get a full resync.
+    sync_tombstone_retention_days: int = 30
+    # Deltas larger than this are answered with a resync instead.
+    sync_max_changes: int = 1000
+
+    # Step notes at least this long (UTF-8 bytes) are stored zlib-compressed; 0 keeps
+    # them plain. Compressed notes are not covered by the search text index.
+    notes_compress_min_bytes: int = 0
+
+    # Stemming and stop words of the search text indexes; "none" matches words as typed.
+    search_language: str = "english"
+
+    presence_flush_interval_seconds: float = 30.0
+    presence_known_users_max: int = 100_000
 
     def cors_origin_list(self) -> list[str]:
         return [o.strip() for o in self.cors_origins.split(",") if o.strip()]
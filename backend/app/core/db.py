@@ -1,17 +1,196 @@
+import importlib.util
+import logging
+import threading
+
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
 
 from app.core.config import settings
+from app.core.metrics import command_listener, registry
+
+logger = logging.getLogger(__name__)
 
 _client: AsyncIOMotorClient | None = None
 
+ReadPreference = Primary | PrimaryPreferred | Secondary | SecondaryPreferred | Nearest
+
+_READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Wire compressors that need an optional package (the "compression" extra);
+# zlib ships with Python.
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy"}
+
+# Upper bounds, in milliseconds, of the pool checkout wait histogram.
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+pool_checkout_wait = registry.histogram(
+    "vibe_mongo_pool_checkout_wait_seconds",
+    "Pool checkout wait, failed checkouts included.",
+    buckets=tuple(ms / 1000 for ms in CHECKOUT_WAIT_BUCKETS_MS),
+)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1)
+            self.in_use = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.pool_clears = 0
+
+    def _observe_wait(self, duration: float | None) -> None:
+        pool_checkout_wait.observe((), duration or 0.0)
+        wait_ms = (duration or 0.0) * 1000
+        self.wait_total_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        for i, bound in enumerate(CHECKOUT_WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self.wait_buckets[i] += 1
+                return
+        self.wait_buckets[-1] += 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self._observe_wait(event.duration)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        with self._lock:
+            self.checkout_failures += 1
+            self._observe_wait(event.duration)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "wait_total_ms": self.wait_total_ms,
+                "wait_max_ms": self.wait_max_ms,
+                "wait_avg_ms": self.wait_total_ms / self.checkouts if self.checkouts else 0.0,
+                "wait_buckets_ms": dict(zip([*map(str, CHECKOUT_WAIT_BUCKETS_MS), "+Inf"], self.wait_buckets)),
+                "in_use": self.in_use,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "pool_clears": self.pool_clears,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+def _compressors() -> list[str]:
+    compressors = []
+    for c in (c.strip() for c in settings.mongodb_compressors.split(",")):
+        if not c:
+            continue
+        if c in _COMPRESSOR_MODULES and importlib.util.find_spec(_COMPRESSOR_MODULES[c]) is None:
+            logger.warning("MongoDB compressor %s skipped: install the 'compression' extra", c)
+            continue
+        compressors.append(c)
+    return compressors
+
+
+def _client_options() -> dict:
+    opts: dict = {
+        "maxPoolSize": settings.mongodb_max_pool_size,
+        "minPoolSize": settings.mongodb_min_pool_size,
+        "event_listeners": [pool_metrics, command_listener],
+    }
+    if settings.mongodb_max_idle_time_ms is not None:
+        opts["maxIdleTimeMS"] = settings.mongodb_max_idle_time_ms
+    if settings.mongodb_wait_queue_timeout_ms is not None:
+        opts["waitQueueTimeoutMS"] = settings.mongodb_wait_queue_timeout_ms
+    compressors = _compressors()
+    if compressors:
+        opts["compressors"] = ",".join(compressors)
+    return opts
+
+
+def read_preference() -> ReadPreference:
+    mode = _READ_PREFERENCES[settings.mongodb_read_preference]
+    if mode is Primary:
+        return Primary()
+    max_staleness = settings.mongodb_max_staleness_seconds
+    return mode(max_staleness=max_staleness if max_staleness is not None else -1)
+
 
 def get_client() -> AsyncIOMotorClient:
     global _client
     if _client is None:
-        _client = AsyncIOMotorClient(settings.mongodb_url)
+        _client = AsyncIOMotorClient(settings.mongodb_url, **_client_options())
     return _client
 
 
+def close_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
 def get_db() -> AsyncIOMotorDatabase:
     return get_client()[settings.mongodb_db]
 
+
+def for_reads(db: AsyncIOMotorDatabase) -> AsyncIOMotorDatabase:
+    # Read-only service calls go through this so they can be routed to
+    # secondaries (MONGODB_READ_PREFERENCE) with bounded staleness. Reads that
+    # back the project view, its ETag or the view cache must not: a GET right
+    # after a write would see a lagging secondary and cache what it read.
+    if settings.mongodb_read_preference == "primary":
+        return db
+    return db.with_options(read_preference=read_preference())
@@ -1,16 +1,35 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.encoding import JSONBytesResponse
+from app.api.middleware import InstrumentationMiddleware
+from app.auth import firebase
 from app.core.config import settings
-from app.core.db import get_db
-from app.services.projects import ensure_indexes
+from app.core.db import close_client, get_db
+from app.services.events import broker
+from app.services.presence import presence
+from app.services.purger import purger
+from app.services.reminder_dispatcher import dispatcher
+from app.services.schema import index_migration
+from app.services.steps import templates
 from app.routes.projects import router as projects_router
 from app.routes.steps import router as steps_router
+from app.routes.metrics import router as metrics_router
 from app.routes.reminders import router as reminders_router
+from app.routes.transfer import router as transfer_router
+from app.routes.events import router as events_router
+from app.routes.analytics import router as analytics_router
+from app.routes.sync import router as sync_router
+from app.routes.search import router as search_router
+
+logger = logging.getLogger(__name__)
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="VibeTracker API")
+    app = FastAPI(title="VibeTracker API", default_response_class=JSONBytesResponse)
 
     app.add_middleware(
         CORSMiddleware,
@@ -18,7 +37,9 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor", "Server-Timing"],
     )
+    app.add_middleware(InstrumentationMiddleware)
 
     @app.get("/api/health")
     async def health():
@@ -27,11 +48,44 @@ def create_app() -> FastAPI:
     @app.on_event("startup")
     async def _startup():
         db = get_db()
-        await ensure_indexes(db)
+        if settings.index_migration == "startup":
+            index_migration.start(db)
+        await templates.load()
+        templates.start()
+        presence.start(db)
+        if settings.reminder_dispatcher_enabled:
+            dispatcher.start(db)
+        purger.start(db)
+        broker.start(db)
+        if settings.firebase_warmup_timeout_seconds > 0:
+            # Awaited so the worker takes traffic only once token checks are warm.
+            try:
+                await asyncio.wait_for(
+                    asyncio.to_thread(firebase.warm_up), timeout=settings.firebase_warmup_timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                logger.warning("firebase warm-up still running after %ss", settings.firebase_warmup_timeout_seconds)
+
+    @app.on_event("shutdown")
+    async def _shutdown():
+        await index_migration.stop()
+        await broker.stop()
+        await purger.stop()
+        await dispatcher.stop()
+        await presence.stop()
+        await templates.stop()
+        close_client()
 
     app.include_router(projects_router, prefix="/api")
     app.include_router(steps_router, prefix="/api")
     app.include_router(reminders_router, prefix="/api")
+    app.include_router(transfer_router, prefix="/api")
+    app.include_router(events_router, prefix="/api")
+    app.include_router(analytics_router, prefix="/api")
+    app.include_router(sync_router, prefix="/api")
+    app.include_router(search_router, prefix="/api")
+    if settings.metrics_enabled:
+        app.include_router(metrics_router, prefix="/api")
 
     return app
 
@@ -0,0 +1 @@
+__all__ = ["strip_step_reminders", "project_storage", "backfill_progress_rollups", "indexes"]
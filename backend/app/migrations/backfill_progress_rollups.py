@@ -0,0 +1,51 @@
+"""Build the progress rollups for every user from their existing projects.
+
+Rollups are otherwise created lazily on a user's first analytics read; running
+this after deploying avoids that first slow read. Safe to rerun and to run
+while the API is serving writes:
+
+    python -m app.migrations.backfill_progress_rollups [--batch-size N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.db import get_db
+from app.services.analytics import rebuild_rollup
+from app.services.presence import USERS_COL
+
+
+async def run(db: AsyncIOMotorDatabase, batch_size: int = 500, concurrency: int = 8) -> int:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def rebuild(uid: str) -> None:
+        async with limit:
+            await rebuild_rollup(db, uid)
+
+    rebuilt = 0
+    last_id = None
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        users = (
+            await db[USERS_COL]
+            .find(query, {"firebase_uid": 1})
+            .sort("_id", 1)
+            .limit(batch_size)
+            .to_list(length=None)
+        )
+        if not users:
+            return rebuilt
+        last_id = users[-1]["_id"]
+        uids = [u["firebase_uid"] for u in users if u.get("firebase_uid")]
+        await asyncio.gather(*(rebuild(uid) for uid in uids))
+        rebuilt += len(uids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.migrations.backfill_progress_rollups")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    print(f"rebuilt progress rollups for {asyncio.run(run(get_db(), args.batch_size, args.concurrency))} users")
@@ -0,0 +1,22 @@
+"""Build the MongoDB indexes for this release.
+
+Meant for the deploy pipeline when INDEX_MIGRATION=off keeps workers from
+checking at startup. Does nothing if the stored index version already
+matches, unless --force is given:
+
+    python -m app.migrations.indexes [--force]
+"""
+
+import argparse
+import asyncio
+
+from app.core.db import get_db
+from app.services.projects import INDEX_VERSION
+from app.services.schema import migrate_indexes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.migrations.indexes")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the stored version matches")
+    args = parser.parse_args()
+    ran = asyncio.run(migrate_indexes(get_db(), force=args.force))
+    print(f"indexes {'built' if ran else 'already current'} for version {INDEX_VERSION}")
@@ -0,0 +1,173 @@
+"""Move projects between the two step-progress layouts.
+
+"embedded" folds each project's step_progress documents into a `steps` map on
+the project and deletes them; "documents" writes the map back out as one
+document per step. Set PROJECT_STORAGE to the target layout first, so new
+projects are created in it, then run:
+
+    python -m app.migrations.project_storage embedded|documents
+
+Each project is switched with a version check, so one that is written to while
+it is being converted is left as it was and reported as skipped; running the
+command again picks it up. Step writes bump the project version only after
+writing the step document, so when folding steps into projects a document is
+deleted only if it is unchanged since it was copied; one written in between is
+copied again.
+"""
+
+import argparse
+import asyncio
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteOne, UpdateOne
+
+from app.core.db import get_db
+from app.services.cache import project_views
+from app.services.notes import NOTES_FIELDS
+from app.services.projects import (
+    EMBEDDED_STORAGE,
+    PROJECTS_COL,
+    STEP_PROGRESS_COL,
+    embedded_step_progress,
+)
+
+STEP_FIELDS = ("status", "progress_percent", *NOTES_FIELDS, "completed_at", "updated_at")
+
+# Rounds of re-copying step documents written during a conversion; with
+# PROJECT_STORAGE already set to the target, new writes go to the map and one is enough.
+LATE_WRITE_ROUNDS = 5
+
+
+def _counters(steps: list[dict[str, Any]]) -> dict[str, int]:
+    total = sum(int(s.get("progress_percent") or 0) for s in steps)
+    return {
+        "progress_sum": total,
+        "progress_count": len(steps),
+        "overall_progress": int(total / max(1, len(steps)) + 0.5),
+    }
+
+
+async def _to_embedded(db: AsyncIOMotorDatabase, projects: list[dict[str, Any]]) -> list[Any]:
+    ids = [p["_id"] for p in projects]
+    steps: dict[Any, list[dict[str, Any]]] = {oid: [] for oid in ids}
+    async for s in db[STEP_PROGRESS_COL].find({"project_id": {"$in": ids}}):
+        steps[s["project_id"]].append(s)
+    ops = [
+        UpdateOne(
+            {"_id": p["_id"], "version": p.get("version"), "storage": {"$ne": EMBEDDED_STORAGE}},
+            {
+                "$set": {
+                    "storage": EMBEDDED_STORAGE,
+                    "steps": {
+                        str(int(s["step_number"])): {f: s.get(f) for f in STEP_FIELDS} for s in steps[p["_id"]]
+                    },
+                    **_counters(steps[p["_id"]]),
+                },
+                "$inc": {"version": 1},
+            },
+        )
+        for p in projects
+    ]
+    await db[PROJECTS_COL].bulk_write(ops, ordered=False)
+    converted = [
+        d["_id"] async for d in db[PROJECTS_COL].find({"_id": {"$in": ids}, "storage": EMBEDDED_STORAGE}, {"_id": 1})
+    ]
+    if converted:
+        await _retire_step_documents(db, converted, [s for oid in converted for s in steps[oid]])
+    return converted
+
+
+def _fold_step(step: dict[str, Any]) -> UpdateOne:
+    # Skipped if the map entry was written after the document was.
+    n = int(step["step_number"])
+    query: dict[str, Any] = {"_id": step["project_id"]}
+    if step.get("updated_at") is not None:
+        query[f"steps.{n}.updated_at"] = {"$not": {"$gte": step["updated_at"]}}
+    return UpdateOne(query, {"$set": {f"steps.{n}": {f: step.get(f) for f in STEP_FIELDS}}})
+
+
+async def _retire_step_documents(
+    db: AsyncIOMotorDatabase, project_ids: list[Any], copied: list[dict[str, Any]]
+) -> None:
+    # A step write that started before the switch may land on its document after
+    # the document was copied. It then no longer matches its copied updated_at,
+    # survives the delete and is folded into the map again. The project counters
+    # need no fix: that write applies its delta to them after the switch.
+    for _ in range(LATE_WRITE_ROUNDS):
+        if copied:
+            await db[STEP_PROGRESS_COL].bulk_write(
+                [DeleteOne({"_id": s["_id"], "updated_at": s.get("updated_at")}) for s in copied], ordered=False
+            )
+        late = await db[STEP_PROGRESS_COL].find({"project_id": {"$in": project_ids}}).to_list(length=None)
+        if not late:
+            return
+        await db[PROJECTS_COL].bulk_write([_fold_step(s) for s in late], ordered=False)
+        copied = late
+
+
+async def _to_documents(db: AsyncIOMotorDatabase, projects: list[dict[str, Any]]) -> list[Any]:
+    # Step documents are upserted before the project flips, so a project skipped
+    # by the version check still reads from its map and a rerun overwrites them.
+    step_ops = [
+        UpdateOne(
+            {"project_id": p["_id"], "step_number": s["step_number"]},
+            {"$set": {"user_id": p["user_id"], **{f: s.get(f) for f in STEP_FIELDS}}},
+            upsert=True,
+        )
+        for p in projects
+        for s in embedded_step_progress(p) or ()
+    ]
+    if step_ops:
+        await db[STEP_PROGRESS_COL].bulk_write(step_ops, ordered=False)
+    ops = [
+        UpdateOne(
+            {"_id": p["_id"], "version": p.get("version"), "storage": EMBEDDED_STORAGE},
+            {"$unset": {"storage": "", "steps": ""}, "$inc": {"version": 1}},
+        )
+        for p in projects
+    ]
+    await db[PROJECTS_COL].bulk_write(ops, ordered=False)
+    ids = [p["_id"] for p in projects]
+    return [
+        d["_id"]
+        async for d in db[PROJECTS_COL].find({"_id": {"$in": ids}, "storage": {"$ne": EMBEDDED_STORAGE}}, {"_id": 1})
+    ]
+
+
+async def run(db: AsyncIOMotorDatabase, to: str, batch_size: int = 200) -> tuple[int, int]:
+    if to == EMBEDDED_STORAGE:
+        query: dict[str, Any] = {"storage": {"$ne": EMBEDDED_STORAGE}}
+        projection: dict[str, Any] = {"version": 1}
+        convert = _to_embedded
+    elif to == "documents":
+        query = {"storage": EMBEDDED_STORAGE}
+        projection = {"version": 1, "user_id": 1, "storage": 1, "steps": 1}
+        convert = _to_documents
+    else:
+        raise ValueError(f"unknown storage layout {to!r}")
+
+    # Deleted projects are left to the purger.
+    query["deleted_at"] = None
+    converted = skipped = 0
+    last_id = None
+    while True:
+        page = {**query, "_id": {"$gt": last_id}} if last_id is not None else query
+        projects = await db[PROJECTS_COL].find(page, projection).sort("_id", 1).limit(batch_size).to_list(length=None)
+        if not projects:
+            return converted, skipped
+        last_id = projects[-1]["_id"]
+        done = await convert(db, projects)
+        for oid in done:
+            await project_views.invalidate(str(oid))
+        converted += len(done)
+        skipped += len(projects) - len(done)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.migrations.project_storage")
+    parser.add_argument("to", choices=[EMBEDDED_STORAGE, "documents"])
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    converted, skipped = asyncio.run(run(get_db(), args.to, args.batch_size))
+    print(f"converted {converted} projects to {args.to} storage, skipped {skipped} changed during conversion")
@@ -0,0 +1,27 @@
+"""Remove the reminder copies that used to be embedded in step_progress documents.
+
+Reminders are read from the `reminders` collection now, so the embedded arrays
+are dead weight. Run with: python -m app.migrations.strip_step_reminders
+"""
+
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.db import get_db
+from app.services.projects import STEP_PROGRESS_COL
+
+
+async def run(db: AsyncIOMotorDatabase, batch_size: int = 1000) -> int:
+    stripped = 0
+    while True:
+        cur = db[STEP_PROGRESS_COL].find({"reminders": {"$exists": True}}, {"_id": 1}).limit(batch_size)
+        ids = [d["_id"] async for d in cur]
+        if not ids:
+            return stripped
+        res = await db[STEP_PROGRESS_COL].update_many({"_id": {"$in": ids}}, {"$unset": {"reminders": ""}})
+        stripped += res.modified_count
+
+
+if __name__ == "__main__":
+    print(f"stripped reminders from {asyncio.run(run(get_db()))} step documents")
@@ -0,0 +1,29 @@
+from app.models.common import BaseOut
+
+
+class PhaseProgressOut(BaseOut):
+    phase: str
+    total: int
+    not_started: int
+    in_progress: int
+    completed: int
+    skipped: int
+    percent_complete: int
+
+
+class WeeklyCompletionsOut(BaseOut):
+    week: str
+    completed: int
+
+
+class StepDurationOut(BaseOut):
+    step_number: int
+    completed: int
+    # Average time from project creation to the step's completion.
+    avg_seconds: float
+
+
+class ProgressAnalyticsOut(BaseOut):
+    phases: list[PhaseProgressOut]
+    weekly_completions: list[WeeklyCompletionsOut]
+    time_to_complete: list[StepDurationOut]
@@ -12,6 +12,7 @@ StepStatus = Literal["not_started", "in_progress", "completed", "skipped"]
 class ProjectCreate(BaseModel):
     name: str = Field(min_length=1, max_length=80)
     description: str = Field(default="", max_length=600)
+    template: str = Field(default="default", min_length=1, max_length=64)
 
 
 class ProjectUpdate(BaseModel):
@@ -24,6 +25,7 @@ class ProjectOut(BaseOut):
     name: str
     description: str
     overall_progress: int
+    template: str = "default"
     created_at: datetime
     updated_at: datetime
 
@@ -35,11 +37,34 @@ class StepProgressPatch(BaseModel):
     completed_at: datetime | None = None
 
 
-class StepProgressOut(BaseOut):
+class StepProgressLeanOut(BaseOut):
     step_number: int
     status: StepStatus
     progress_percent: int
-    notes: str
     completed_at: datetime | None = None
     reminders: list[dict] = []
+    # Enough to tell whether a step has notes and whether a copy fetched earlier is current.
+    notes_length: int = 0
+    notes_hash: str | None = None
+
+
+class StepProgressOut(StepProgressLeanOut):
+    notes: str
+
+
+class StepNotesOut(BaseOut):
+    step_number: int
+    notes: str
+    notes_length: int
+    notes_hash: str
+
 
+class StepProgressBatchItem(StepProgressPatch):
+    step_number: int = Field(ge=1)
+
+
+class StepProgressBatchResult(BaseOut):
+    step_number: int
+    ok: bool
+    error: str | None = None
+    progress: StepProgressOut | None = None
@@ -0,0 +1,15 @@
+from typing import Literal
+
+from app.models.common import BaseOut
+
+
+class SearchHitOut(BaseOut):
+    kind: Literal["project", "step"]
+    project_id: str
+    project_name: str
+    step_number: int | None = None
+    # The matched field: name or description for projects, notes for steps.
+    field: str
+    snippet: str
+    # Relative to the best hit of the same kind: 1.0 for the top project and the top step.
+    score: float
@@ -19,3 +19,9 @@ class StepTemplateOut(BaseOut):
     resources: list[ResourceOut] = []
     external_links: list[ResourceOut] = []
 
+
+class TemplateOut(BaseOut):
+    name: str
+    version: str
+    step_count: int
+
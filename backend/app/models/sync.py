@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from app.models.common import BaseOut, ReminderOut
+from app.models.projects import ProjectOut, StepStatus
+
+
+class SyncStepOut(BaseOut):
+    project_id: str
+    step_number: int
+    status: StepStatus
+    progress_percent: int
+    notes: str
+    completed_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+class SyncReminderOut(ReminderOut):
+    project_id: str
+    step_number: int
+    updated_at: datetime | None = None
+
+
+class DeletedOut(BaseOut):
+    kind: str
+    id: str
+
+
+class SyncOut(BaseOut):
+    # Pass back as `since` on the next call.
+    watermark: str
+    # True: drop local state and refetch through the regular endpoints.
+    reset: bool
+    projects: list[ProjectOut] = []
+    steps: list[SyncStepOut] = []
+    reminders: list[SyncReminderOut] = []
+    deleted: list[DeletedOut] = []
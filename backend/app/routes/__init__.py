@@ -1,2 +1,2 @@
-__all__ = ["projects", "steps", "reminders"]
+__all__ = ["projects", "steps", "reminders", "metrics", "transfer", "events", "analytics", "sync", "search"]
 
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from app.api.deps import CurrentUser, DB
+from app.api.encoding import model_response
+from app.models.analytics import ProgressAnalyticsOut
+from app.services.analytics import get_progress_analytics
+from app.services.projects import ensure_user
+
+router = APIRouter(tags=["analytics"])
+
+
+@router.get("/analytics", response_model=ProgressAnalyticsOut)
+async def progress_analytics(db=DB, decoded=CurrentUser):
+    await ensure_user(db, decoded)
+    return model_response(ProgressAnalyticsOut, await get_progress_analytics(db, decoded.get("uid")))
@@ -0,0 +1,50 @@
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import CurrentUser, DB, StreamUserId
+from app.core.config import settings
+from app.services.events import broker
+from app.services.projects import ensure_user
+from app.services.stream_tickets import issue_stream_ticket
+
+router = APIRouter(tags=["events"])
+
+# Sent when a subscriber's queue overflowed: the client should refetch what it shows.
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+
+
+async def _stream(user_id: str) -> AsyncIterator[bytes]:
+    # Subscribing here rather than in the handler ties the subscription to the
+    # response actually being streamed; one never iterated holds nothing.
+    sub = broker.subscribe(user_id)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            events, dropped = await sub.next(settings.events_heartbeat_seconds)
+            if dropped:
+                yield RESYNC_FRAME
+            if not events:
+                # Comment line; keeps proxies from closing an idle connection.
+                yield b": ping\n\n"
+            for event in events:
+                yield event.frame
+    finally:
+        broker.unsubscribe(sub)
+
+
+@router.post("/events/ticket")
+async def events_ticket(db=DB, decoded=CurrentUser):
+    await ensure_user(db, decoded)
+    ticket = await issue_stream_ticket(db, decoded.get("uid"))
+    return {"ticket": ticket, "expires_in": settings.events_ticket_ttl_seconds}
+
+
+@router.get("/events")
+async def events_stream(user_id=StreamUserId):
+    return StreamingResponse(
+        _stream(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
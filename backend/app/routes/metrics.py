@@ -0,0 +1,84 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from app.auth.firebase import token_cache
+from app.core.config import settings
+from app.core.db import pool_metrics
+from app.core.metrics import registry
+from app.services.cache import project_views
+from app.services.events import broker
+from app.services.presence import presence
+from app.services.purger import purger
+from app.services.reminder_dispatcher import dispatcher
+from app.services.singleflight import reads
+from app.services.steps import templates
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _stats_samples(prefix: str, stats: dict, kinds: dict[str, str]):
+    for key, kind in kinds.items():
+        if key in stats:
+            name = f"{prefix}_{key}_total" if kind == "counter" else f"{prefix}_{key}"
+            yield name, kind, f"{prefix} {key.replace('_', ' ')}.", [({}, stats[key])]
+
+
+@registry.collector
+def _component_stats():
+    yield from _stats_samples(
+        "vibe_auth_token_cache", token_cache.stats(), {"hits": "counter", "misses": "counter", "size": "gauge"}
+    )
+    yield from _stats_samples(
+        "vibe_project_cache",
+        project_views.stats(),
+        {"hits": "counter", "misses": "counter", "invalidations": "counter", "stale": "counter", "size": "gauge"},
+    )
+    yield from _stats_samples(
+        "vibe_presence", presence.stats(), {"known_users": "gauge", "pending_updates": "gauge"}
+    )
+    yield from _stats_samples("vibe_reminders", dispatcher.stats(), {"sent": "counter", "failed": "counter", "upcoming": "gauge"})
+    yield from _stats_samples(
+        "vibe_purge",
+        purger.stats(),
+        {"purged_projects": "counter", "purged_documents": "counter", "expired_reminders": "counter"},
+    )
+    yield from _stats_samples(
+        "vibe_events",
+        broker.stats(),
+        {"subscribers": "gauge", "published": "counter", "delivered": "counter", "dropped": "counter"},
+    )
+    yield from _stats_samples(
+        "vibe_singleflight", reads.stats(), {"leaders": "counter", "shared": "counter", "in_flight": "gauge"}
+    )
+    yield from _stats_samples(
+        "vibe_step_templates", templates.stats(), {"templates": "gauge", "reloads": "counter", "reload_errors": "counter"}
+    )
+    yield from _stats_samples(
+        "vibe_mongo_pool",
+        pool_metrics.stats(),
+        {
+            "checkouts": "counter",
+            "checkout_failures": "counter",
+            "in_use": "gauge",
+            "connections_created": "counter",
+            "connections_closed": "counter",
+            "pool_clears": "counter",
+        },
+    )
+
+
+def _require_token(request: Request) -> None:
+    token = settings.metrics_token
+    if token is None:
+        return
+    header = request.headers.get("authorization") or ""
+    if not secrets.compare_digest(header.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(_require_token)])
+async def metrics():
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
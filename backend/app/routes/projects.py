@@ -1,47 +1,114 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import Annotated
+
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response
 
 from app.api.deps import CurrentUser, DB
-from app.models.projects import ProjectCreate, ProjectOut, ProjectUpdate, StepProgressOut, StepProgressPatch
+from app.api.encoding import json_bytes, model_response
+from app.api.etag import etag_matches, not_modified, weak_etag
+from app.models.projects import (
+    ProjectCreate,
+    ProjectOut,
+    ProjectUpdate,
+    StepProgressBatchItem,
+    StepProgressBatchResult,
+    StepProgressLeanOut,
+    StepProgressOut,
+    StepNotesOut,
+    StepProgressPatch,
+)
+from app.services.cache import project_views
+from app.services.notes import notes_summary, read_notes
 from app.services.projects import (
     create_project,
     delete_project,
+    embedded_step_progress,
     ensure_user,
     get_project,
+    get_project_version,
+    get_step_notes,
     list_projects,
     list_step_progress,
     update_project,
     update_step_progress,
+    update_steps_progress,
 )
-from app.services.steps import get_steps
+from app.services.purger import purger
+from app.services.reminders import list_project_reminders
+from app.services.singleflight import reads
+from app.services.steps import DEFAULT_TEMPLATE, StepTemplate, templates
 
 router = APIRouter(tags=["projects"])
 
+PROJECT_CACHE_CONTROL = "private, no-cache"
+
+
+PROJECT_PAGE_SIZE = 50
+
 
 @router.get("/projects", response_model=list[ProjectOut])
-async def projects_list(db=DB, decoded=CurrentUser):
+async def projects_list(
+    limit: int | None = Query(default=None, ge=1, le=200),
+    after: str | None = None,
+    db=DB,
+    decoded=CurrentUser,
+):
     await ensure_user(db, decoded)
     uid = decoded.get("uid")
-    return await list_projects(db, uid)
+    # Paging is opt-in: clients that send neither parameter get every project.
+    if limit is None and after:
+        limit = PROJECT_PAGE_SIZE
+    try:
+        # Any project write in this process bumps `invalidations`, so lists requested
+        # after a write never share a query that started before it.
+        projects, next_cursor = await reads.do(
+            ("projects", uid, limit, after, project_views.invalidations),
+            lambda: list_projects(db, uid, limit=limit, after=after),
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return model_response(ProjectOut, projects, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
 
 
 @router.post("/projects", response_model=ProjectOut)
 async def projects_create(body: ProjectCreate, db=DB, decoded=CurrentUser):
     await ensure_user(db, decoded)
     uid = decoded.get("uid")
-    return await create_project(db, uid, body.name, body.description)
+    try:
+        project = await create_project(db, uid, body.name, body.description, body.template)
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Unknown template")
+    return model_response(ProjectOut, project)
 
 
 @router.get("/projects/{project_id}")
-async def projects_get(project_id: str, db=DB, decoded=CurrentUser):
+async def projects_get(project_id: str, request: Request, lean: bool = False, db=DB, decoded=CurrentUser):
     await ensure_user(db, decoded)
     uid = decoded.get("uid")
-    proj = await get_project(db, uid, project_id)
-    if not proj:
-        raise HTTPException(status_code=404, detail="Project not found")
+    proj, cached = await _project_or_view(db, uid, project_id)
 
-    steps = get_steps()
-    progress = await list_step_progress(db, __oid(project_id))
-    return {"project": proj, "steps": steps, "progress": [_normalize_progress(p) for p in progress]}
+    etag = _project_etag(proj, "pl" if lean else "p")
+    if etag_matches(request, etag):
+        return not_modified(etag, PROJECT_CACHE_CONTROL)
+
+    progress = await _view_progress(db, proj, cached, lean)
+    # The step templates are spliced in pre-serialized instead of re-encoded per request.
+    body = b"".join(
+        [
+            b'{"project":',
+            json_bytes(proj),
+            b',"steps":',
+            _template(proj).catalog.body,
+            b',"progress":',
+            json_bytes(progress),
+            b"}",
+        ]
+    )
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": PROJECT_CACHE_CONTROL},
+    )
 
 
 @router.put("/projects/{project_id}", response_model=ProjectOut)
@@ -51,7 +118,7 @@ async def projects_update(project_id: str, body: ProjectUpdate, db=DB, decoded=C
     updated = await update_project(db, uid, project_id, body.model_dump())
     if not updated:
         raise HTTPException(status_code=404, detail="Project not found")
-    return updated
+    return model_response(ProjectOut, updated)
 
 
 @router.delete("/projects/{project_id}")
@@ -61,18 +128,47 @@ async def projects_delete(project_id: str, db=DB, decoded=CurrentUser):
     ok = await delete_project(db, uid, project_id)
     if not ok:
         raise HTTPException(status_code=404, detail="Project not found")
+    purger.notify()
     return {"ok": True}
 
 
-@router.get("/projects/{project_id}/steps", response_model=list[StepProgressOut])
-async def projects_steps_get(project_id: str, db=DB, decoded=CurrentUser):
+@router.get("/projects/{project_id}/steps", response_model=list[StepProgressOut] | list[StepProgressLeanOut])
+async def projects_steps_get(project_id: str, request: Request, lean: bool = False, db=DB, decoded=CurrentUser):
     await ensure_user(db, decoded)
     uid = decoded.get("uid")
-    proj = await get_project(db, uid, project_id)
-    if not proj:
-        raise HTTPException(status_code=404, detail="Project not found")
-    progress = await list_step_progress(db, __oid(project_id))
-    return [_normalize_progress(p) for p in progress]
+    proj, cached = await _project_or_view(db, uid, project_id)
+
+    etag = _project_etag(proj, "sl" if lean else "s")
+    if etag_matches(request, etag):
+        return not_modified(etag, PROJECT_CACHE_CONTROL)
+    progress = await _view_progress(db, proj, cached, lean)
+    return model_response(
+        StepProgressLeanOut if lean else StepProgressOut,
+        progress,
+        headers={"ETag": etag, "Cache-Control": PROJECT_CACHE_CONTROL},
+    )
+
+
+@router.get("/projects/{project_id}/steps/{step_number}/notes", response_model=StepNotesOut)
+async def projects_step_notes_get(project_id: str, step_number: int, request: Request, db=DB, decoded=CurrentUser):
+    await ensure_user(db, decoded)
+    uid = decoded.get("uid")
+    step = await get_step_notes(db, uid, project_id, int(step_number))
+    if step is None:
+        raise HTTPException(status_code=404, detail="Project or step not found")
+    notes_length, notes_hash = notes_summary(step)
+    # Keyed on the notes alone, so a client holding the lean view can tell from
+    # notes_hash whether its copy is current without asking.
+    etag = weak_etag("n", project_id, step_number, notes_hash)
+    if etag_matches(request, etag):
+        return not_modified(etag, PROJECT_CACHE_CONTROL)
+    notes = {
+        "step_number": step_number,
+        "notes": read_notes(step),
+        "notes_length": notes_length,
+        "notes_hash": notes_hash,
+    }
+    return model_response(StepNotesOut, notes, headers={"ETag": etag, "Cache-Control": PROJECT_CACHE_CONTROL})
 
 
 @router.put("/projects/{project_id}/steps/{step_number}", response_model=StepProgressOut)
@@ -82,21 +178,119 @@ async def projects_step_update(project_id: str, step_number: int, body: StepProg
     updated = await update_step_progress(db, uid, project_id, int(step_number), body.model_dump())
     if not updated:
         raise HTTPException(status_code=404, detail="Project or step not found")
-    return _normalize_progress(updated)
-
-
-def _normalize_progress(doc: dict) -> dict:
-    d = dict(doc)
-    d.pop("_id", None)
-    d.pop("project_id", None)
-    d["step_number"] = int(d.get("step_number"))
-    d["progress_percent"] = int(d.get("progress_percent") or 0)
-    d["status"] = d.get("status") or "not_started"
-    d["notes"] = d.get("notes") or ""
-    d["reminders"] = d.get("reminders") or []
+    return model_response(StepProgressOut, _normalize_progress(updated))
+
+
+@router.patch("/projects/{project_id}/steps", response_model=list[StepProgressBatchResult])
+async def projects_steps_batch_update(
+    project_id: str,
+    body: Annotated[list[StepProgressBatchItem], Body(max_length=100)],
+    db=DB,
+    decoded=CurrentUser,
+):
+    await ensure_user(db, decoded)
+    uid = decoded.get("uid")
+    patches = [(item.step_number, item.model_dump(exclude={"step_number"})) for item in body]
+    results = await update_steps_progress(db, uid, project_id, patches)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    for r in results:
+        if r["progress"] is not None:
+            r["progress"] = _normalize_progress(r["progress"])
+    return model_response(StepProgressBatchResult, results)
+
+
+async def _project_or_view(db, uid: str, project_id: str) -> tuple[dict, dict | None]:
+    # A cached view answers both the ETag check and the body; on a miss only the
+    # project is read here, so a 304 never loads step progress.
+    async def current(view: dict) -> bool:
+        # Every project write bumps `version`, including writes made by other
+        # workers, whose invalidations never reach this process's cache.
+        proj = view["project"]
+        if proj.get("user_id") != uid:
+            return False
+        return await get_project_version(db, uid, project_id) == int(proj.get("version") or 0)
+
+    cached = await project_views.get(project_id, validate=current)
+    if cached is not None:
+        return cached["project"], cached
+    proj = await reads.do(
+        ("project", uid, project_id, project_views.epoch(project_id)), lambda: get_project(db, uid, project_id)
+    )
+    if not proj:
+        raise HTTPException(status_code=404, detail="Project not found")
+    # A shallow copy per caller: the view drops keys from it.
+    return dict(proj), None
+
+
+async def _load_progress(db, project_id: str, embedded: list[dict] | None, lean: bool = False) -> list[dict]:
+    project_oid = __oid(project_id)
+    if embedded is None:
+        progress, reminders = await asyncio.gather(
+            list_step_progress(db, project_oid, lean), list_project_reminders(db, project_oid)
+        )
+    else:
+        progress, reminders = embedded, await list_project_reminders(db, project_oid)
+    return [_normalize_progress(p, reminders, lean) for p in progress]
+
+
+async def _view_progress(db, proj: dict, cached: dict | None, lean: bool = False) -> list[dict]:
+    if cached is not None:
+        return _lean(cached["progress"]) if lean else cached["progress"]
+    epoch = project_views.epoch(proj["id"])
+    # Embedded-storage projects arrived with their steps; the map is moved out so
+    # it is neither serialized nor cached as part of the project.
+    embedded = embedded_step_progress(proj)
+    proj.pop("steps", None)
+    # The epoch changes on every write, so a view requested after one never
+    # shares a load that started before it.
+    normalized = await reads.do(
+        ("progress", proj["user_id"], proj["id"], epoch, lean),
+        lambda: _load_progress(db, proj["id"], embedded, lean),
+    )
+    # Only full views are cached; a lean one is cut from them on a hit.
+    if not lean:
+        await project_views.put(proj["id"], {"project": proj, "progress": normalized}, epoch)
+    return normalized
+
+
+def _project_etag(proj: dict, kind: str = "p") -> str:
+    updated_at = proj.get("updated_at")
+    stamp = int(updated_at.timestamp() * 1000) if updated_at else 0
+    return weak_etag(kind, proj["id"], proj.get("version") or 0, stamp, _template(proj).version)
+
+
+def _template(proj: dict) -> StepTemplate:
+    # A template whose file was removed falls back to the default one.
+    try:
+        return templates.get(proj.get("template") or DEFAULT_TEMPLATE)
+    except KeyError:
+        return templates.get()
+
+
+def _normalize_progress(doc: dict, reminders: dict[int, list[dict]] | None = None, lean: bool = False) -> dict:
+    # Built field by field: the raw document also holds ids, stamps and the
+    # pre-write "previous" state, none of which clients see.
+    step_number = int(doc.get("step_number"))
+    notes_length, notes_hash = notes_summary(doc)
+    d = {
+        "step_number": step_number,
+        "status": doc.get("status") or "not_started",
+        "progress_percent": int(doc.get("progress_percent") or 0),
+        "completed_at": doc.get("completed_at"),
+        "notes_length": notes_length,
+        "notes_hash": notes_hash,
+        "reminders": (reminders or {}).get(step_number, []),
+    }
+    if not lean:
+        d["notes"] = read_notes(doc)
     return d
 
 
+def _lean(progress: list[dict]) -> list[dict]:
+    return [{k: v for k, v in p.items() if k != "notes"} for p in progress]
+
+
 def __oid(project_id: str):
     from bson import ObjectId
 
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from app.api.deps import CurrentUser, DB
+from app.api.encoding import model_response
+from app.models.search import SearchHitOut
+from app.services.projects import ensure_user
+from app.services.search import search
+
+router = APIRouter(tags=["search"])
+
+
+@router.get("/search", response_model=list[SearchHitOut])
+async def search_projects(
+    q: str = Query(min_length=2, max_length=200),
+    limit: int = Query(default=20, ge=1, le=50),
+    after: str | None = None,
+    db=DB,
+    decoded=CurrentUser,
+):
+    await ensure_user(db, decoded)
+    uid = decoded.get("uid")
+    try:
+        hits, next_cursor = await search(db, uid, q, limit=limit, after=after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return model_response(SearchHitOut, hits, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
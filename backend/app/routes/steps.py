@@ -1,11 +1,32 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
 
-from app.services.steps import get_steps
+from app.api.encoding import encoded_response
+from app.api.etag import etag_matches, not_modified, weak_etag
+from app.models.steps import TemplateOut
+from app.services.steps import DEFAULT_TEMPLATE, templates
 
 router = APIRouter(tags=["steps"])
 
+# Templates reload while the server runs, so clients revalidate every use; the
+# ETag keeps that to a 304 while nothing changed.
+STEPS_CACHE_CONTROL = "public, no-cache"
+
 
 @router.get("/steps")
-async def list_step_templates():
-    return get_steps()
+async def list_step_templates(request: Request, template: str = DEFAULT_TEMPLATE):
+    try:
+        tpl = templates.get(template)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Template not found")
+    catalog = tpl.catalog
+    etag = weak_etag("steps", tpl.name, catalog.version)
+    if etag_matches(request, etag):
+        return not_modified(etag, STEPS_CACHE_CONTROL)
+    return encoded_response(
+        request, catalog.body, catalog.encoded, headers={"ETag": etag, "Cache-Control": STEPS_CACHE_CONTROL}
+    )
+
 
+@router.get("/templates", response_model=list[TemplateOut])
+async def list_templates():
+    return [{"name": tpl.name, "version": tpl.version, "step_count": len(tpl.steps)} for tpl in templates.all()]
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException
+
+from app.api.deps import CurrentUser, DB
+from app.api.encoding import model_response
+from app.models.sync import SyncOut
+from app.services.projects import ensure_user
+from app.services.sync import get_changes
+
+router = APIRouter(tags=["sync"])
+
+
+@router.get("/sync", response_model=SyncOut)
+async def sync(since: str | None = None, db=DB, decoded=CurrentUser):
+    await ensure_user(db, decoded)
+    uid = decoded.get("uid")
+    try:
+        changes = await get_changes(db, uid, since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    return model_response(SyncOut, changes)
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import CurrentUser, DB
+from app.services.projects import ensure_user
+from app.services.transfer import TransferError, export_user_data, import_user_data
+
+router = APIRouter(tags=["transfer"])
+
+NDJSON = "application/x-ndjson"
+
+
+@router.get("/export")
+async def export_data(db=DB, decoded=CurrentUser):
+    await ensure_user(db, decoded)
+    uid = decoded.get("uid")
+    return StreamingResponse(
+        export_user_data(db, uid),
+        media_type=NDJSON,
+        headers={"Content-Disposition": 'attachment; filename="vibetracker-export.ndjson"'},
+    )
+
+
+@router.post("/import")
+async def import_data(request: Request, db=DB, decoded=CurrentUser):
+    await ensure_user(db, decoded)
+    uid = decoded.get("uid")
+    try:
+        return await import_user_data(db, uid, request.stream())
+    except TransferError as e:
+        # Lines before the failing one stay imported; the counts say how far it got.
+        raise HTTPException(status_code=400, detail={"error": str(e), "imported": e.imported})
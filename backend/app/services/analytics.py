@@ -0,0 +1,109 @@
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from app.services.mongo import utcnow
+from app.services.projects import PROJECTS_COL, STEP_PROGRESS_COL, embedded_step_progress
+from app.services.rollups import ROLLUPS_COL, step_increments
+
+STATUSES = ("not_started", "in_progress", "completed", "skipped")
+# Writes that land while a rebuild scans make it start over; after this many
+# tries the result is returned but the rollup stays stale for the next read.
+REBUILD_ATTEMPTS = 3
+
+
+def _nest(inc: dict[str, float]) -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    for key, value in inc.items():
+        node = out
+        *parents, leaf = key.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = value
+    return out
+
+
+async def _scan(db: AsyncIOMotorDatabase, user_id: str, batch_size: int) -> dict[str, float]:
+    inc: dict[str, float] = {}
+    query: dict[str, Any] = {"user_id": user_id, "deleted_at": None}
+    projection = {"template": 1, "created_at": 1, "storage": 1, "steps": 1}
+    last_id = None
+    while True:
+        page = {**query, "_id": {"$gt": last_id}} if last_id is not None else query
+        projects = await db[PROJECTS_COL].find(page, projection).sort("_id", 1).limit(batch_size).to_list(length=None)
+        if not projects:
+            return inc
+        last_id = projects[-1]["_id"]
+        steps: dict[Any, list[dict[str, Any]]] = {}
+        documents = []
+        for p in projects:
+            embedded = embedded_step_progress(p)
+            if embedded is None:
+                documents.append(p["_id"])
+            else:
+                steps[p["_id"]] = embedded
+        if documents:
+            cur = db[STEP_PROGRESS_COL].find(
+                {"project_id": {"$in": documents}},
+                {"project_id": 1, "step_number": 1, "status": 1, "completed_at": 1},
+            )
+            async for s in cur:
+                steps.setdefault(s["project_id"], []).append(s)
+        for p in projects:
+            for s in steps.get(p["_id"], ()):
+                step_increments(p, None, s, inc)
+
+
+async def rebuild_rollup(db: AsyncIOMotorDatabase, user_id: str, batch_size: int = 200) -> dict[str, Any]:
+    """Recomputes a user's rollup from their projects and stores it."""
+    col = db[ROLLUPS_COL]
+    doc: dict[str, Any] = {}
+    for _ in range(REBUILD_ATTEMPTS):
+        # A placeholder first, so step writes during the scan bump its rev
+        # instead of being missed by a rollup that does not exist yet.
+        try:
+            await col.update_one({"_id": user_id}, {"$setOnInsert": {"rev": 0, "stale": True}}, upsert=True)
+        except DuplicateKeyError:
+            pass
+        current = await col.find_one({"_id": user_id}, {"rev": 1})
+        rev = (current or {}).get("rev", 0)
+        doc = {**_nest(await _scan(db, user_id, batch_size)), "rev": rev + 1, "updated_at": utcnow()}
+        res = await col.replace_one({"_id": user_id, "rev": rev}, doc)
+        if res.matched_count:
+            break
+    return doc
+
+
+def _format(doc: dict[str, Any]) -> dict[str, Any]:
+    phases = []
+    for name, counts in sorted((doc.get("phases") or {}).items()):
+        counts = {s: max(0, int(counts.get(s) or 0)) for s in STATUSES}
+        total = sum(counts.values())
+        phases.append(
+            {
+                "phase": name,
+                "total": total,
+                **counts,
+                "percent_complete": int(counts["completed"] * 100 / total + 0.5) if total else 0,
+            }
+        )
+    weeks = [
+        {"week": week, "completed": int(n)} for week, n in sorted((doc.get("weeks") or {}).items()) if n > 0
+    ]
+    durations = []
+    for n, d in sorted((doc.get("durations") or {}).items(), key=lambda kv: int(kv[0])):
+        count = int(d.get("count") or 0)
+        if count > 0:
+            durations.append(
+                {"step_number": int(n), "completed": count, "avg_seconds": float(d.get("seconds") or 0) / count}
+            )
+    return {"phases": phases, "weekly_completions": weeks, "time_to_complete": durations}
+
+
+async def get_progress_analytics(db: AsyncIOMotorDatabase, user_id: str) -> dict[str, Any]:
+    # One document read; only a missing or stale rollup pays for a full rebuild.
+    doc = await db[ROLLUPS_COL].find_one({"_id": user_id})
+    if doc is None or doc.get("stale"):
+        doc = await rebuild_rollup(db, user_id)
+    return _format(doc)
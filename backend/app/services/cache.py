@@ -0,0 +1,179 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import bson
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: dict[str, Any], ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    def size(self) -> int | None:
+        return None
+
+
+class LocalLRUBackend(CacheBackend):
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def size(self) -> int | None:
+        return len(self._entries)
+
+
+class MemorySharedBackend(CacheBackend):
+    """In-process backend that stores values BSON-encoded, as the Redis backend does.
+
+    PROJECT_CACHE_BACKEND=memory runs the shared-cache serialization round-trip
+    in a single process, without a Redis server.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return bson.decode(entry[1])
+
+    async def set(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, bson.encode(value))
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def size(self) -> int | None:
+        return len(self._entries)
+
+
+class RedisBackend(CacheBackend):
+    def __init__(self, url: str, prefix: str = "vibe:"):
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url)
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        raw = await self._redis.get(self.prefix + key)
+        return bson.decode(raw) if raw else None
+
+    async def set(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        await self._redis.set(self.prefix + key, bson.encode(value), px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+
+class ReadThroughCache:
+    """Read-through cache with explicit invalidation.
+
+    Each key has an epoch that `invalidate` bumps; a load that started before an
+    invalidation is not written back, so a slow reader cannot reinstate data a
+    concurrent write just replaced.
+
+    Epochs only see this process's writes. Where other workers write too (any
+    shared backend, or several workers with local ones), callers pass `validate`
+    to `get` so an entry is checked against the source before it is served.
+    """
+
+    def __init__(self, backend: CacheBackend | None, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale = 0
+        self._generation = 0
+        self._epochs: dict[str, int] = {}
+
+    def epoch(self, key: str) -> tuple[int, int]:
+        return self._generation, self._epochs.get(key, 0)
+
+    async def get(
+        self, key: str, validate: Callable[[dict[str, Any]], Awaitable[bool]] | None = None
+    ) -> dict[str, Any] | None:
+        """The cached value, or None; an entry `validate` rejects is dropped and counts as a miss."""
+        if self.backend is None:
+            return None
+        cached = await self.backend.get(key)
+        if cached is not None and validate is not None and not await validate(cached):
+            self.stale += 1
+            await self.backend.delete(key)
+            cached = None
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    async def put(self, key: str, value: dict[str, Any], epoch: tuple[int, int]) -> None:
+        # `epoch` is what epoch(key) returned before the value was loaded.
+        if self.backend is not None and self.epoch(key) == epoch:
+            await self.backend.set(key, value, self.ttl)
+
+    async def invalidate(self, key: str) -> None:
+        self.invalidations += 1
+        if len(self._epochs) > 100_000:
+            # Starting a new generation makes every in-flight load skip its write-back.
+            self._epochs.clear()
+            self._generation += 1
+        self._epochs[key] = self._epochs.get(key, 0) + 1
+        if self.backend is not None:
+            await self.backend.delete(key)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "size": self.backend.size() if self.backend else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "stale": self.stale,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+
+def _backend(name: str) -> CacheBackend | None:
+    if name == "none":
+        return None
+    if name == "memory":
+        return MemorySharedBackend()
+    if name == "redis":
+        return RedisBackend(settings.project_cache_redis_url or "redis://localhost:6379/0")
+    return LocalLRUBackend(maxsize=settings.project_cache_size)
+
+
+project_views = ReadThroughCache(_backend(settings.project_cache_backend), ttl=settings.project_cache_ttl_seconds)
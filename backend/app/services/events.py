@@ -0,0 +1,164 @@
+import asyncio
+import itertools
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.api.encoding import dumps
+from app.core.config import settings
+from app.services.mongo import utcnow
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COL = "events"
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    type: str
+    frame: bytes
+
+
+def _frame(event_id: str, event_type: str, data: dict[str, Any]) -> bytes:
+    return f"id: {event_id}\nevent: {event_type}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+class Subscription:
+    """One client's bounded event queue.
+
+    When the client falls behind, the oldest events are dropped and counted; the
+    stream then tells the client to resync instead of buffering without limit.
+    """
+
+    def __init__(self, user_id: str, maxsize: int):
+        self.user_id = user_id
+        self._events: deque[Event] = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+        self._dropped = 0
+
+    def put(self, event: Event) -> bool:
+        dropped = len(self._events) == self._events.maxlen
+        if dropped:
+            self._dropped += 1
+        self._events.append(event)
+        self._ready.set()
+        return dropped
+
+    async def next(self, timeout: float) -> tuple[list[Event], int]:
+        """Everything queued so far and how many were dropped; ([], 0) on timeout."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return [], 0
+        self._ready.clear()
+        events, dropped = list(self._events), self._dropped
+        self._events.clear()
+        self._dropped = 0
+        return events, dropped
+
+
+class EventBroker:
+    """Fans project change events out to the owning user's open streams.
+
+    With the change-stream backend, publish() inserts into EVENTS_COL and every
+    worker's watcher delivers the insert to its own subscribers, so a write on
+    one worker reaches streams held by any other.
+    """
+
+    def __init__(self, backend: str = "local", queue_size: int = 100):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._seq = itertools.count(1)
+        self._db: AsyncIOMotorDatabase | None = None
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, user_id: str) -> Subscription:
+        sub = Subscription(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.user_id]
+
+    def _fan_out(self, user_id: str, event: Event) -> None:
+        for sub in self._subscribers.get(user_id, ()):
+            self.delivered += 1
+            self.dropped += sub.put(event)
+
+    async def publish(self, user_id: str, event_type: str, data: dict[str, Any]) -> None:
+        # Called after the write has committed; a failure here never fails the write.
+        self.published += 1
+        if self._task is not None:
+            try:
+                await self._db[EVENTS_COL].insert_one(
+                    {"user_id": user_id, "type": event_type, "data": data, "created_at": utcnow()}
+                )
+            except PyMongoError:
+                logger.exception("could not publish %s event", event_type)
+            return
+        event_id = str(next(self._seq))
+        self._fan_out(user_id, Event(event_id, event_type, _frame(event_id, event_type, data)))
+
+    async def _watch(self) -> None:
+        resume_token = None
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        while True:
+            try:
+                async with self._db[EVENTS_COL].watch(pipeline, resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        doc = change["fullDocument"]
+                        if doc["user_id"] in self._subscribers:
+                            event_id = str(doc["_id"])
+                            frame = _frame(event_id, doc["type"], doc["data"])
+                            self._fan_out(doc["user_id"], Event(event_id, doc["type"], frame))
+            except PyMongoError as e:
+                # A resume token the server rejects (e.g. history already trimmed)
+                # would fail forever, so only transient errors keep it.
+                if isinstance(e, OperationFailure):
+                    resume_token = None
+                logger.exception("event change stream failed; reconnecting")
+                await asyncio.sleep(1.0)
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        # The local backend needs no task: publish() delivers directly.
+        if self.backend != "change_stream":
+            return
+        self._db = db
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+broker = EventBroker(backend=settings.events_backend, queue_size=settings.events_queue_size)
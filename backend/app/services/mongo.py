@@ -1,7 +1,11 @@
-from datetime import datetime
+import base64
+import json
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import OperationFailure
 
 
 def oid() -> ObjectId:
@@ -20,3 +24,63 @@ def to_str_id(doc: dict[str, Any]) -> dict[str, Any]:
 def utcnow() -> datetime:
     return datetime.utcnow()
 
+
+def naive_utc(ts: datetime) -> datetime:
+    # Stored timestamps are naive UTC (what Mongo hands back); client input may carry an offset.
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_cursor(ts: datetime, doc_id: ObjectId) -> str:
+    ms = (ts - _EPOCH) // timedelta(milliseconds=1)
+    raw = json.dumps([ms, str(doc_id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        ms, doc_id = json.loads(raw)
+        return _EPOCH + timedelta(milliseconds=int(ms)), ObjectId(doc_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def ensure_ttl_index(col: AsyncIOMotorCollection, field: str, expire_after_seconds: int, **kwargs: Any) -> None:
+    keys = [(field, 1)]
+    try:
+        await col.create_index(keys, expireAfterSeconds=expire_after_seconds, **kwargs)
+    except OperationFailure as e:
+        # IndexOptionsConflict: the retention setting changed since the index was built.
+        if e.code != 85:
+            raise
+        await col.database.command(
+            "collMod", col.name, index={"keyPattern": dict(keys), "expireAfterSeconds": expire_after_seconds}
+        )
+
+
+async def drop_ttl_index(col: AsyncIOMotorCollection, field: str) -> None:
+    for index in await col.list_indexes().to_list(length=None):
+        if "expireAfterSeconds" in index and dict(index["key"]) == {field: 1}:
+            await col.drop_index(index["name"])
+
+
+async def ensure_text_index(
+    col: AsyncIOMotorCollection, keys: list[tuple[str, Any]], name: str, **kwargs: Any
+) -> None:
+    # A collection holds one text index, and its fields, weights or language cannot
+    # be changed in place: a conflicting one is dropped and rebuilt.
+    try:
+        await col.create_index(keys, name=name, **kwargs)
+    except OperationFailure as e:
+        # IndexOptionsConflict / IndexKeySpecsConflict
+        if e.code not in (85, 86):
+            raise
+        for index in await col.list_indexes().to_list(length=None):
+            if "textIndexVersion" in index:
+                await col.drop_index(index["name"])
+        await col.create_index(keys, name=name, **kwargs)
@@ -0,0 +1,51 @@
+import hashlib
+import zlib
+from typing import Any
+
+from bson import Binary
+
+from app.core.config import settings
+
+# Stored next to a step's notes so lean views can describe them without the text:
+# notes_length (characters) and notes_hash (changes whenever the text does).
+# Text of at least NOTES_COMPRESS_MIN_BYTES is kept zlib-compressed in notes_z,
+# with `notes` left empty.
+NOTES_HASH_CHARS = 16
+NOTES_FIELDS = ("notes", "notes_z", "notes_length", "notes_hash")
+
+
+def notes_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:NOTES_HASH_CHARS]
+
+
+def encode_notes(text: str) -> dict[str, Any]:
+    """The fields that store `text` as a step's notes."""
+    raw = text.encode("utf-8")
+    threshold = settings.notes_compress_min_bytes
+    compressed = threshold > 0 and len(raw) >= threshold
+    return {
+        "notes": "" if compressed else text,
+        "notes_z": Binary(zlib.compress(raw)) if compressed else None,
+        "notes_length": len(text),
+        "notes_hash": notes_hash(text),
+    }
+
+
+def read_notes(doc: dict[str, Any]) -> str:
+    packed = doc.get("notes_z")
+    if packed:
+        return zlib.decompress(packed).decode("utf-8")
+    return doc.get("notes") or ""
+
+
+def has_summary(doc: dict[str, Any]) -> bool:
+    return doc.get("notes_hash") is not None
+
+
+def notes_summary(doc: dict[str, Any]) -> tuple[int, str]:
+    # Steps written before notes were summarized have no stored hash; their text
+    # must be in `doc` then.
+    if has_summary(doc):
+        return int(doc.get("notes_length") or 0), doc["notes_hash"]
+    text = read_notes(doc)
+    return len(text), notes_hash(text)
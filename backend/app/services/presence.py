@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.services.mongo import utcnow
+
+USERS_COL = "users"
+
+logger = logging.getLogger(__name__)
+
+
+class UserPresence:
+    """Write-behind `users` tracking.
+
+    The first request from a uid upserts the user document; after that only
+    `last_seen_at` (and profile changes) are buffered in memory and written in
+    one unordered `bulk_write` per flush interval.
+    """
+
+    def __init__(self, flush_interval: float = 30.0, max_known: int = 100_000):
+        self.flush_interval = flush_interval
+        self.max_known = max_known
+        self._known: OrderedDict[str, tuple[str | None, str | None]] = OrderedDict()
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._db: AsyncIOMotorDatabase | None = None
+        self._task: asyncio.Task | None = None
+
+    @staticmethod
+    def _profile(decoded: dict) -> tuple[str | None, str | None]:
+        return decoded.get("email"), decoded.get("name") or decoded.get("displayName")
+
+    async def touch(self, db: AsyncIOMotorDatabase, decoded: dict) -> None:
+        uid = decoded.get("uid")
+        if not uid:
+            return
+        profile = self._profile(decoded)
+        now = utcnow()
+        known = self._known.get(uid)
+        if known is None:
+            await self._upsert(db, uid, profile, now)
+            self._remember(uid, profile)
+            return
+
+        self._known.move_to_end(uid)
+        fields: dict[str, Any] = {"last_seen_at": now}
+        if known != profile:
+            fields["email"], fields["display_name"] = profile
+            self._known[uid] = profile
+        self._pending.setdefault(uid, {}).update(fields)
+
+    async def _upsert(self, db: AsyncIOMotorDatabase, uid: str, profile: tuple, now: datetime) -> None:
+        email, display_name = profile
+        await db[USERS_COL].update_one(
+            {"firebase_uid": uid},
+            {
+                "$setOnInsert": {"firebase_uid": uid, "created_at": now},
+                "$set": {"email": email, "display_name": display_name, "last_seen_at": now},
+            },
+            upsert=True,
+        )
+
+    def _remember(self, uid: str, profile: tuple) -> None:
+        self._known[uid] = profile
+        while len(self._known) > self.max_known:
+            self._known.popitem(last=False)
+
+    async def flush(self, db: AsyncIOMotorDatabase | None = None) -> int:
+        db = db if db is not None else self._db
+        if db is None or not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        ops = [UpdateOne({"firebase_uid": uid}, {"$set": fields}) for uid, fields in pending.items()]
+        try:
+            await db[USERS_COL].bulk_write(ops, ordered=False)
+        except Exception:
+            # Put the batch back without clobbering anything newer recorded meanwhile.
+            for uid, fields in pending.items():
+                self._pending[uid] = {**fields, **self._pending.get(uid, {})}
+            raise
+        return len(ops)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("user presence flush failed")
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        self._db = db
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {"known_users": len(self._known), "pending_updates": len(self._pending)}
+
+
+presence = UserPresence(
+    flush_interval=settings.presence_flush_interval_seconds,
+    max_known=settings.presence_known_users_max,
+)
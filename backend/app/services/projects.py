@@ -1,17 +1,43 @@
+import asyncio
+from datetime import datetime
 from typing import Any
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
-
-from app.services.mongo import to_str_id, utcnow
-from app.services.steps import get_steps
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.db import for_reads
+from app.core.metrics import phase
+from app.services.cache import project_views
+from app.services.events import EVENTS_COL, broker
+from app.services.mongo import (
+    decode_cursor,
+    drop_ttl_index,
+    encode_cursor,
+    ensure_text_index,
+    ensure_ttl_index,
+    naive_utc,
+    to_str_id,
+    utcnow,
+)
+from app.services.notes import NOTES_FIELDS, encode_notes, has_summary, read_notes
+from app.services import rollups
+from app.services.presence import USERS_COL, presence
+from app.services.steps import DEFAULT_TEMPLATE, templates
+from app.services.stream_tickets import STREAM_TICKETS_COL
+from app.services.tombstones import TOMBSTONES_COL, record_deletion
 
 
 PROJECTS_COL = "projects"
 STEP_PROGRESS_COL = "step_progress"
-USERS_COL = "users"
 REMINDERS_COL = "reminders"
 
+# Projects with this `storage` keep step progress in a `steps` map keyed by step
+# number instead of in STEP_PROGRESS_COL; projects without the field are "documents".
+EMBEDDED_STORAGE = "embedded"
+
 
 def _oid_or_none(id_str: str) -> ObjectId | None:
     try:
@@ -20,78 +46,176 @@ def _oid_or_none(id_str: str) -> ObjectId | None:
         return None
 
 
+def owned_project_query(oid: ObjectId, user_id: str) -> dict[str, Any]:
+    # Soft-deleted projects are invisible until the purger removes them.
+    return {"_id": oid, "user_id": user_id, "deleted_at": None}
+
+
+# Bump whenever ensure_indexes changes; app.services.schema rebuilds indexes only
+# when the version (or a setting they depend on) differs from the stored one.
+INDEX_VERSION = 5
+
+
 async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
-    await db[PROJECTS_COL].create_index([("user_id", 1), ("updated_at", -1)])
+    await db[PROJECTS_COL].create_index([("user_id", 1), ("updated_at", -1), ("_id", -1)])
+    await db[PROJECTS_COL].create_index(
+        [("deleted_at", 1)], partialFilterExpression={"deleted_at": {"$exists": True}}
+    )
+    # Text indexes behind GET /search; the user_id prefix keeps every search
+    # within one user's entries.
+    await ensure_text_index(
+        db[PROJECTS_COL],
+        [("user_id", 1), ("name", "text"), ("description", "text")],
+        name="projects_text",
+        weights={"name": 10, "description": 3},
+        default_language=settings.search_language,
+    )
     await db[STEP_PROGRESS_COL].create_index([("project_id", 1), ("step_number", 1)], unique=True)
+    await ensure_text_index(
+        db[STEP_PROGRESS_COL],
+        [("user_id", 1), ("notes", "text")],
+        name="step_progress_text",
+        default_language=settings.search_language,
+    )
+    # Modification stamps behind GET /sync.
+    await db[STEP_PROGRESS_COL].create_index([("user_id", 1), ("updated_at", 1)])
     await db[USERS_COL].create_index([("firebase_uid", 1)], unique=True)
     await db[REMINDERS_COL].create_index([("user_id", 1), ("sent", 1), ("remind_at", 1)])
     await db[REMINDERS_COL].create_index([("project_id", 1), ("step_number", 1)])
-
-
-async def ensure_user(db: AsyncIOMotorDatabase, decoded: dict) -> None:
-    uid = decoded.get("uid")
-    if not uid:
-        return
-    await db[USERS_COL].update_one(
-        {"firebase_uid": uid},
-        {
-            "$setOnInsert": {"firebase_uid": uid, "created_at": utcnow()},
-            "$set": {
-                "email": decoded.get("email"),
-                "display_name": decoded.get("name") or decoded.get("displayName"),
-                "last_seen_at": utcnow(),
-            },
-        },
-        upsert=True,
+    await db[REMINDERS_COL].create_index([("sent", 1), ("remind_at", 1)])
+    await db[REMINDERS_COL].create_index([("user_id", 1), ("updated_at", 1)])
+    await db[TOMBSTONES_COL].create_index([("user_id", 1), ("deleted_at", 1)])
+    await ensure_ttl_index(db[TOMBSTONES_COL], "deleted_at", settings.sync_tombstone_retention_days * 86_400)
+    # Sent reminders are expired by the purger, not a TTL index, so that each
+    # removal leaves a tombstone for GET /sync.
+    await drop_ttl_index(db[REMINDERS_COL], "sent_at")
+    await db[REMINDERS_COL].create_index(
+        [("sent_at", 1)], name="sent_reminders", partialFilterExpression={"sent": True}
     )
+    await ensure_ttl_index(db[STREAM_TICKETS_COL], "expires_at", 0)
+    if settings.events_backend == "change_stream":
+        await ensure_ttl_index(db[EVENTS_COL], "created_at", settings.events_retention_seconds)
 
 
-async def list_projects(db: AsyncIOMotorDatabase, user_id: str) -> list[dict[str, Any]]:
-    cur = db[PROJECTS_COL].find({"user_id": user_id}).sort("updated_at", -1)
-    return [to_str_id(p) async for p in cur]
+async def ensure_user(db: AsyncIOMotorDatabase, decoded: dict) -> None:
+    with phase("user"):
+        await presence.touch(db, decoded)
+
+
+PROJECT_LIST_FIELDS = {
+    "name": 1,
+    "description": 1,
+    "overall_progress": 1,
+    "template": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
+
+
+async def list_projects(
+    db: AsyncIOMotorDatabase, user_id: str, limit: int | None = None, after: str | None = None
+) -> tuple[list[dict[str, Any]], str | None]:
+    """One page of the user's projects and the cursor of the next; every project when `limit` is None."""
+    query: dict[str, Any] = {"user_id": user_id, "deleted_at": None}
+    if after:
+        ts, last_id = decode_cursor(after)
+        query["$or"] = [{"updated_at": {"$lt": ts}}, {"updated_at": ts, "_id": {"$lt": last_id}}]
+    cur = for_reads(db)[PROJECTS_COL].find(query, PROJECT_LIST_FIELDS).sort([("updated_at", -1), ("_id", -1)])
+    if limit is not None:
+        cur = cur.limit(limit + 1)
+    docs = await cur.to_list(length=None)
+    next_cursor = None
+    if limit is not None and len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last["updated_at"], last["_id"])
+    for d in docs:
+        d["id"] = str(d.pop("_id"))
+    return docs, next_cursor
+
+
+def _new_step() -> dict[str, Any]:
+    return {"status": "not_started", "progress_percent": 0, "notes": "", "completed_at": None}
+
+
+def _created_step(now: datetime) -> dict[str, Any]:
+    # What a new project stores per step, including the empty-notes summary.
+    return {**_new_step(), **encode_notes(""), "updated_at": now}
+
+
+def embedded_step_progress(doc: dict[str, Any]) -> list[dict[str, Any]] | None:
+    """Step progress held in an embedded-storage project, in step order; None for the documents layout."""
+    if doc.get("storage") != EMBEDDED_STORAGE:
+        return None
+    steps = doc.get("steps") or {}
+    # Entries created by a partial $set may lack fields, so defaults fill the gaps.
+    return [{**_new_step(), **steps[n], "step_number": int(n)} for n in sorted(steps, key=int)]
 
 
-async def create_project(db: AsyncIOMotorDatabase, user_id: str, name: str, description: str) -> dict[str, Any]:
+async def create_project(
+    db: AsyncIOMotorDatabase, user_id: str, name: str, description: str, template: str = DEFAULT_TEMPLATE
+) -> dict[str, Any]:
+    """Raises KeyError if `template` is not a registered template."""
     now = utcnow()
+    tpl = templates.get(template)
+    steps = tpl.steps
     doc = {
         "user_id": user_id,
         "name": name,
         "description": description,
         "overall_progress": 0,
+        "progress_sum": 0,
+        # The counters cover the steps this template version had, and the project
+        # keeps its own step set, so a later template reload never needs a recompute.
+        "progress_count": len(steps),
+        "template": tpl.name,
+        "template_version": tpl.version,
+        "version": 1,
         "created_at": now,
         "updated_at": now,
     }
-    res = await db[PROJECTS_COL].insert_one(doc)
-    project_id = res.inserted_id
-
-    steps = get_steps()
-    progress_docs = [
-        {
-            "project_id": project_id,
-            "step_number": int(s.get("number")),
-            "status": "not_started",
-            "progress_percent": 0,
-            "notes": "",
-            "completed_at": None,
-            "reminders": [],
-        }
-        for s in steps
-    ]
-    if progress_docs:
-        await db[STEP_PROGRESS_COL].insert_many(progress_docs)
+    if settings.project_storage == EMBEDDED_STORAGE:
+        doc["storage"] = EMBEDDED_STORAGE
+        doc["steps"] = {str(int(s.get("number"))): _created_step(now) for s in steps}
+        await db[PROJECTS_COL].insert_one(doc)
+        doc.pop("steps")
+    else:
+        res = await db[PROJECTS_COL].insert_one(doc)
+        progress_docs = [
+            {
+                "project_id": res.inserted_id,
+                "user_id": user_id,
+                "step_number": int(s.get("number")),
+                **_created_step(now),
+            }
+            for s in steps
+        ]
+        if progress_docs:
+            await db[STEP_PROGRESS_COL].insert_many(progress_docs)
+    await rollups.record_project_created(db, user_id, doc)
 
-    created = await db[PROJECTS_COL].find_one({"_id": project_id, "user_id": user_id})
-    return to_str_id(created)
+    # insert_one filled in _id, so the inserted document is returned as-is.
+    return to_str_id(doc)
 
 
 async def get_project(db: AsyncIOMotorDatabase, user_id: str, project_id: str) -> dict[str, Any] | None:
     oid = _oid_or_none(project_id)
     if not oid:
         return None
-    doc = await db[PROJECTS_COL].find_one({"_id": oid, "user_id": user_id})
+    # On the primary: the result feeds the project ETag and the view cache.
+    doc = await db[PROJECTS_COL].find_one(owned_project_query(oid, user_id))
     return to_str_id(doc) if doc else None
 
 
+async def get_project_version(db: AsyncIOMotorDatabase, user_id: str, project_id: str) -> int | None:
+    """The project's write version, or None if it is not the user's or was deleted."""
+    oid = _oid_or_none(project_id)
+    if not oid:
+        return None
+    doc = await db[PROJECTS_COL].find_one(owned_project_query(oid, user_id), {"version": 1})
+    return None if doc is None else int(doc.get("version") or 0)
+
+
 async def update_project(
     db: AsyncIOMotorDatabase, user_id: str, project_id: str, patch: dict[str, Any]
 ) -> dict[str, Any] | None:
@@ -102,37 +226,82 @@ async def update_project(
     if not patch:
         return await get_project(db, user_id, project_id)
     patch["updated_at"] = utcnow()
-    await db[PROJECTS_COL].update_one({"_id": oid, "user_id": user_id}, {"$set": patch})
-    return await get_project(db, user_id, project_id)
+    doc = await db[PROJECTS_COL].find_one_and_update(
+        owned_project_query(oid, user_id),
+        {"$set": patch, "$inc": {"version": 1}},
+        projection={"steps": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    await project_views.invalidate(project_id)
+    if not doc:
+        return None
+    await broker.publish(
+        user_id,
+        "project",
+        {"project_id": project_id, "name": doc.get("name"), "description": doc.get("description"), **_summary(doc)},
+    )
+    return to_str_id(doc)
 
 
 async def delete_project(db: AsyncIOMotorDatabase, user_id: str, project_id: str) -> bool:
     oid = _oid_or_none(project_id)
     if not oid:
         return False
-    res = await db[PROJECTS_COL].delete_one({"_id": oid, "user_id": user_id})
-    if res.deleted_count:
-        await db[STEP_PROGRESS_COL].delete_many({"project_id": oid})
-        return True
-    return False
-
-
-async def list_step_progress(db: AsyncIOMotorDatabase, project_oid: ObjectId) -> list[dict[str, Any]]:
-    cur = db[STEP_PROGRESS_COL].find({"project_id": project_oid}).sort("step_number", 1)
-    return [p async for p in cur]
-
-
-async def update_step_progress(
-    db: AsyncIOMotorDatabase, user_id: str, project_id: str, step_number: int, patch: dict[str, Any]
+    res = await db[PROJECTS_COL].update_one(
+        owned_project_query(oid, user_id), {"$set": {"deleted_at": utcnow()}, "$inc": {"version": 1}}
+    )
+    await project_views.invalidate(project_id)
+    # Step progress and reminders are removed in the background by the purger.
+    if res.matched_count:
+        await record_deletion(db, user_id, "project", project_id)
+        await rollups.mark_stale(db, user_id)
+    return bool(res.matched_count)
+
+
+async def touch_project(db: AsyncIOMotorDatabase, oid: ObjectId) -> None:
+    await db[PROJECTS_COL].update_one({"_id": oid}, {"$set": {"updated_at": utcnow()}, "$inc": {"version": 1}})
+    await project_views.invalidate(str(oid))
+
+
+async def list_step_progress(
+    db: AsyncIOMotorDatabase, project_oid: ObjectId, lean: bool = False
+) -> list[dict[str, Any]]:
+    """A project's step documents; `lean` leaves the notes text out, keeping its stored summary."""
+    projection = {"notes": 0, "notes_z": 0} if lean else None
+    cur = db[STEP_PROGRESS_COL].find({"project_id": project_oid}, projection).sort("step_number", 1)
+    docs = await cur.to_list(length=None)
+    legacy = [d["_id"] for d in docs if lean and not has_summary(d)]
+    if legacy:
+        # Steps not written since summaries were introduced need their text to be summarized.
+        cur = db[STEP_PROGRESS_COL].find({"_id": {"$in": legacy}}, {"notes": 1, "notes_z": 1})
+        texts = {d["_id"]: d async for d in cur}
+        for d in docs:
+            d.update(texts.get(d["_id"], {}))
+    return docs
+
+
+async def get_step_notes(
+    db: AsyncIOMotorDatabase, user_id: str, project_id: str, step_number: int
 ) -> dict[str, Any] | None:
+    """The stored notes fields of one step, or None if the project or step is not the user's."""
     oid = _oid_or_none(project_id)
     if not oid:
         return None
-
-    proj = await db[PROJECTS_COL].find_one({"_id": oid, "user_id": user_id})
+    fields = dict.fromkeys(NOTES_FIELDS, 1)
+    # The project read checks ownership and that the project is not deleted; the
+    # step document is read alongside it for the documents layout.
+    proj, step = await asyncio.gather(
+        db[PROJECTS_COL].find_one(owned_project_query(oid, user_id), {"storage": 1, f"steps.{step_number}": 1}),
+        db[STEP_PROGRESS_COL].find_one({"project_id": oid, "step_number": step_number}, fields),
+    )
     if not proj:
         return None
+    if proj.get("storage") == EMBEDDED_STORAGE:
+        return (proj.get("steps") or {}).get(str(step_number))
+    return step
+
 
+def _normalize_step_patch(patch: dict[str, Any]) -> dict[str, Any]:
     patch = {k: v for k, v in patch.items() if v is not None}
     if "progress_percent" in patch:
         p = int(patch["progress_percent"])
@@ -142,29 +311,337 @@ async def update_step_progress(
 
     if patch.get("status") == "completed" and patch.get("completed_at") is None:
         patch["completed_at"] = utcnow()
+    if isinstance(patch.get("completed_at"), datetime):
+        # Writers hand the patched step to the rollups, which compare it with stored, naive stamps.
+        patch["completed_at"] = naive_utc(patch["completed_at"])
+    if "notes" in patch:
+        patch.update(encode_notes(patch["notes"]))
+    return patch
+
+
+def _step_update_pipeline(patch: dict[str, Any], now: datetime) -> list[dict[str, Any]]:
+    # Fields older documents lack get their defaults in the same write. Documents
+    # written before the BEFORE image was used also drop their stored "previous".
+    return [
+        {"$set": {k: {"$ifNull": [f"${k}", v]} for k, v in _new_step().items()}},
+        {"$set": {**{k: {"$literal": v} for k, v in patch.items()}, "updated_at": now}},
+        {"$project": {"previous": 0}},
+    ]
+
+
+STEP_STATE_FIELDS = ("status", "progress_percent", "completed_at")
 
-    await db[STEP_PROGRESS_COL].update_one(
-        {"project_id": oid, "step_number": step_number},
-        {"$set": patch, "$setOnInsert": {"project_id": oid, "step_number": step_number}},
-        upsert=True,
+
+def _written_step(before: dict[str, Any] | None, patch: dict[str, Any], now: datetime) -> dict[str, Any]:
+    """The step as _step_update_pipeline leaves `before`, with its pre-write state under "previous"."""
+    step = {**(before or {}), **patch, "updated_at": now}
+    for k, v in _new_step().items():
+        if step.get(k) is None:
+            step[k] = v
+    step["previous"] = {f: before.get(f) for f in STEP_STATE_FIELDS} if before else {}
+    return step
+
+
+async def _adopt_legacy_project(db: AsyncIOMotorDatabase, user_id: str, oid: ObjectId) -> bool:
+    # Projects created before step docs carried user_id and the project kept a
+    # running progress sum get both filled in once, on their first step update.
+    proj = await db[PROJECTS_COL].find_one(
+        {**owned_project_query(oid, user_id), "storage": {"$ne": EMBEDDED_STORAGE}}, {"progress_count": 1}
+    )
+    if not proj:
+        return False
+    await db[STEP_PROGRESS_COL].update_many(
+        {"project_id": oid, "user_id": {"$exists": False}}, {"$set": {"user_id": user_id}}
     )
+    if "progress_count" not in proj:
+        agg = await db[STEP_PROGRESS_COL].aggregate(
+            [
+                {"$match": {"project_id": oid}},
+                {"$group": {"_id": None, "sum": {"$sum": "$progress_percent"}, "count": {"$sum": 1}}},
+            ]
+        ).to_list(length=1)
+        total, count = (agg[0]["sum"], agg[0]["count"]) if agg else (0, 0)
+        await db[PROJECTS_COL].update_one(
+            {"_id": oid}, {"$set": {"progress_sum": int(total or 0), "progress_count": int(count)}}
+        )
+    return True
+
+
+PROJECT_SUMMARY_FIELDS = ("overall_progress", "version", "updated_at")
+# What step writers return about the project: the summary plus what the
+# progress rollups need to attribute the change.
+PROJECT_STATE_PROJECTION = dict.fromkeys((*PROJECT_SUMMARY_FIELDS, "template", "created_at"), 1)
+
+
+def _summary(doc: dict[str, Any]) -> dict[str, Any]:
+    # The project fields a step write changes; sent along with progress events.
+    return {f: doc.get(f) for f in PROJECT_SUMMARY_FIELDS}
+
 
-    # Recompute overall progress
-    steps = get_steps()
-    n_steps = max(1, len(steps))
-    agg = await db[STEP_PROGRESS_COL].aggregate(
+async def _apply_progress_delta(
+    db: AsyncIOMotorDatabase, user_id: str, oid: ObjectId, sum_delta: int, count_delta: int
+) -> dict[str, Any] | None:
+    doc = await db[PROJECTS_COL].find_one_and_update(
+        owned_project_query(oid, user_id),
         [
-            {"$match": {"project_id": oid}},
-            {"$group": {"_id": "$project_id", "avg": {"$avg": "$progress_percent"}}},
-        ]
-    ).to_list(length=1)
-    overall = int(round((agg[0]["avg"] if agg else 0) or 0))
-    await db[PROJECTS_COL].update_one({"_id": oid}, {"$set": {"overall_progress": overall, "updated_at": utcnow()}})
+            {
+                "$set": {
+                    "progress_sum": {"$add": [{"$ifNull": ["$progress_sum", 0]}, sum_delta]},
+                    "progress_count": {"$add": [{"$ifNull": ["$progress_count", 0]}, count_delta]},
+                    "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+                    "updated_at": utcnow(),
+                }
+            },
+            {
+                "$set": {
+                    "overall_progress": {
+                        "$toInt": {
+                            "$floor": {
+                                "$add": [{"$divide": ["$progress_sum", {"$max": [1, "$progress_count"]}]}, 0.5]
+                            }
+                        }
+                    }
+                }
+            },
+        ],
+        projection=PROJECT_STATE_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    return doc
+
 
-    updated = await db[STEP_PROGRESS_COL].find_one({"project_id": oid, "step_number": step_number})
-    if not updated:
+def _progress_delta(updated: dict[str, Any]) -> tuple[int, int]:
+    previous = updated.get("previous") or {}
+    new = int(updated.get("progress_percent") or 0)
+    if previous.get("progress_percent") is None:
+        return new, 1
+    return new - int(previous["progress_percent"]), 0
+
+
+async def _update_embedded_steps(
+    db: AsyncIOMotorDatabase, user_id: str, oid: ObjectId, patches: dict[int, dict[str, Any]]
+) -> tuple[dict[int, dict[str, Any]], dict[str, Any]] | None:
+    # One $set addresses every touched entry of the steps map; the BEFORE image of
+    # just those entries gives the exact counter delta. Returns None if the project
+    # is missing, deleted or not in the embedded layout.
+    now = utcnow()
+    fields: dict[str, Any] = {"updated_at": now}
+    for n, patch in patches.items():
+        fields.update({f"steps.{n}.{k}": v for k, v in {**patch, "updated_at": now}.items()})
+    before = await db[PROJECTS_COL].find_one_and_update(
+        {**owned_project_query(oid, user_id), "storage": EMBEDDED_STORAGE},
+        {"$set": fields, "$inc": {"version": 1}},
+        projection={**PROJECT_STATE_PROJECTION, **{f"steps.{n}": 1 for n in patches}},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        return None
+
+    old_steps = before.pop("steps", None) or {}
+    updated: dict[int, dict[str, Any]] = {}
+    sum_delta = count_delta = 0
+    for n, patch in patches.items():
+        old = old_steps.get(str(n))
+        step = {**_new_step(), **(old or {}), **patch, "updated_at": now, "step_number": n}
+        # Same shape as the "previous" _written_step derives for step documents.
+        step["previous"] = {f: old.get(f) for f in STEP_STATE_FIELDS} if old else {}
+        sum_delta += int(step["progress_percent"] or 0) - int((old or {}).get("progress_percent") or 0)
+        count_delta += old is None
+        updated[n] = step
+    project = {**before, "version": (before.get("version") or 0) + 1, "updated_at": fields["updated_at"]}
+    if sum_delta or count_delta:
+        project = await _apply_progress_delta(db, user_id, oid, sum_delta, count_delta) or project
+    return updated, project
+
+
+async def _update_embedded_step(
+    db: AsyncIOMotorDatabase, user_id: str, oid: ObjectId, step_number: int, patch: dict[str, Any]
+) -> tuple[dict[str, Any], dict[str, Any]] | None:
+    result = await _update_embedded_steps(db, user_id, oid, {step_number: patch})
+    return (result[0][step_number], result[1]) if result is not None else None
+
+
+async def _update_step_document(
+    db: AsyncIOMotorDatabase, user_id: str, oid: ObjectId, step_number: int, patch: dict[str, Any]
+) -> tuple[dict[str, Any], dict[str, Any]] | None:
+    now = utcnow()
+    pipeline = _step_update_pipeline(patch, now)
+    query = {"project_id": oid, "step_number": step_number, "user_id": user_id}
+    steps = db[STEP_PROGRESS_COL]
+
+    # Ownership is enforced by user_id on the step itself, so the common case is
+    # this write plus the project counter update below. The BEFORE image gives
+    # the counter delta; the written step is derived from it.
+    before = await steps.find_one_and_update(query, pipeline, return_document=ReturnDocument.BEFORE)
+    if before is None:
+        if not await _adopt_legacy_project(db, user_id, oid):
+            return None
+        # None here means the step was inserted.
+        before = await steps.find_one_and_update(
+            query, pipeline, upsert=True, return_document=ReturnDocument.BEFORE
+        )
+    updated = _written_step(before, patch, now)
+    updated.update(query)
+
+    sum_delta, count_delta = _progress_delta(updated)
+    project = await _apply_progress_delta(db, user_id, oid, sum_delta, count_delta)
+    if project is None:
+        # The project was deleted; its steps are about to be purged anyway.
         return None
+
     updated.pop("_id", None)
     updated["project_id"] = str(updated["project_id"])
+    return updated, project
+
+
+STEP_EVENT_FIELDS = ("step_number", "status", "progress_percent", "completed_at", "notes_length", "notes_hash")
+
+
+async def _after_step_write(
+    db: AsyncIOMotorDatabase, user_id: str, oid: ObjectId, steps: list[dict[str, Any]], project: dict[str, Any]
+) -> None:
+    await broker.publish(
+        user_id,
+        "progress",
+        {
+            "project_id": str(oid),
+            **_summary(project),
+            "steps": [{**{f: s.get(f) for f in STEP_EVENT_FIELDS}, "notes": read_notes(s)} for s in steps],
+        },
+    )
+    await rollups.record_step_changes(db, user_id, project, steps)
+
+
+async def update_step_progress(
+    db: AsyncIOMotorDatabase, user_id: str, project_id: str, step_number: int, patch: dict[str, Any]
+) -> dict[str, Any] | None:
+    oid = _oid_or_none(project_id)
+    if not oid:
+        return None
+
+    patch = _normalize_step_patch(patch)
+    # The configured layout is tried first; a project still in the other layout
+    # costs an extra miss per update until it is migrated.
+    writers = [_update_step_document, _update_embedded_step]
+    if settings.project_storage == EMBEDDED_STORAGE:
+        writers.reverse()
+    result = None
+    for write in writers:
+        result = await write(db, user_id, oid, step_number, patch)
+        if result is not None:
+            break
+    await project_views.invalidate(str(oid))
+    if result is None:
+        return None
+    updated, project = result
+    await _after_step_write(db, user_id, oid, [updated], project)
     return updated
 
+
+async def update_steps_progress(
+    db: AsyncIOMotorDatabase, user_id: str, project_id: str, patches: list[tuple[int, dict[str, Any]]]
+) -> list[dict[str, Any]] | None:
+    oid = _oid_or_none(project_id)
+    if not oid:
+        return None
+
+    # Later patches for the same step win, matching what sequential PUTs would do.
+    merged: dict[int, dict[str, Any]] = {}
+    for step_number, patch in patches:
+        merged.setdefault(int(step_number), {}).update({k: v for k, v in patch.items() if v is not None})
+
+    normalized = {n: _normalize_step_patch(patch) for n, patch in merged.items()}
+
+    # With embedded storage configured the write itself checks ownership; the
+    # project is only read up front when that misses or for the documents layout.
+    embedded = None
+    if normalized and settings.project_storage == EMBEDDED_STORAGE:
+        embedded = await _update_embedded_steps(db, user_id, oid, normalized)
+    if embedded is None:
+        proj = await db[PROJECTS_COL].find_one(owned_project_query(oid, user_id), {"storage": 1, "progress_count": 1})
+        if not proj:
+            return None
+        if not normalized:
+            return []
+        if proj.get("storage") == EMBEDDED_STORAGE:
+            embedded = await _update_embedded_steps(db, user_id, oid, normalized)
+            if embedded is None:
+                return None
+    if embedded is not None:
+        steps, project = embedded
+        await project_views.invalidate(str(oid))
+        await _after_step_write(db, user_id, oid, list(steps.values()), project)
+        return [{"step_number": n, "ok": True, "error": None, "progress": step} for n, step in steps.items()]
+
+    if "progress_count" not in proj:
+        await _adopt_legacy_project(db, user_id, oid)
+    step_numbers = list(normalized)
+    # bulk_write returns no documents, so the pre-write state comes from a read
+    # just before it. Each write only applies while the step still holds that
+    # state, which keeps the counter deltas exact; a step written in between
+    # misses its filter, collides on the unique index and is redone alone.
+    cur = db[STEP_PROGRESS_COL].find(
+        {"project_id": oid, "step_number": {"$in": step_numbers}}, dict.fromkeys(("step_number", *STEP_STATE_FIELDS), 1)
+    )
+    before = {int(d["step_number"]): d async for d in cur}
+    now = utcnow()
+    ops = [
+        UpdateOne(
+            {"project_id": oid, "step_number": n, **{f: before.get(n, {}).get(f) for f in STEP_STATE_FIELDS}},
+            _step_update_pipeline({**normalized[n], "user_id": user_id}, now),
+            upsert=True,
+        )
+        for n in step_numbers
+    ]
+    errors: dict[int, str] = {}
+    raced: list[int] = []
+    try:
+        await db[STEP_PROGRESS_COL].bulk_write(ops, ordered=False)
+    except BulkWriteError as e:
+        for err in e.details.get("writeErrors", []):
+            n = step_numbers[err["index"]]
+            if err.get("code") == 11000:
+                raced.append(n)
+            else:
+                errors[n] = err.get("errmsg") or "write failed"
+
+    # The same running-sum update as single writes, with the batch's summed deltas.
+    previous: dict[int, dict[str, Any]] = {}
+    sum_delta = count_delta = 0
+    for n in step_numbers:
+        if n in errors or n in raced:
+            continue
+        step = _written_step(before.get(n), normalized[n], now)
+        previous[n] = step["previous"]
+        step_sum, step_count = _progress_delta(step)
+        sum_delta += step_sum
+        count_delta += step_count
+    project = await _apply_progress_delta(db, user_id, oid, sum_delta, count_delta)
+    if project is None:
+        return None
+    for n in raced:
+        # The single-step path applies its own counter delta.
+        redone = await _update_step_document(db, user_id, oid, n, normalized[n])
+        if redone is None:
+            errors[n] = "not found"
+            continue
+        step, project = redone
+        previous[n] = step["previous"]
+    await project_views.invalidate(str(oid))
+
+    cur = db[STEP_PROGRESS_COL].find({"project_id": oid, "step_number": {"$in": step_numbers}})
+    by_number = {int(d["step_number"]): d async for d in cur}
+    for n, doc in by_number.items():
+        doc["previous"] = previous.get(n, {})
+    written = [by_number[n] for n in step_numbers if n in by_number and n in previous]
+    await _after_step_write(db, user_id, oid, written, project)
+    results = []
+    for n in step_numbers:
+        doc = by_number.get(n)
+        if n in errors or doc is None:
+            results.append({"step_number": n, "ok": False, "error": errors.get(n, "not found"), "progress": None})
+            continue
+        doc.pop("_id", None)
+        doc["project_id"] = str(doc["project_id"])
+        results.append({"step_number": n, "ok": True, "error": None, "progress": doc})
+    return results
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.mongo import utcnow
+from app.services.projects import PROJECTS_COL, REMINDERS_COL, STEP_PROGRESS_COL
+from app.services.tombstones import record_deletions
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectPurger:
+    """Removes soft-deleted projects together with their step progress and reminders.
+
+    Child documents go first, in batches of `batch_size`, so each delete stays
+    short; the project document itself is removed last, which makes an
+    interrupted purge safe to resume.
+
+    Each pass also expires reminders sent more than REMINDER_RETENTION_DAYS
+    ago, recording a sync tombstone for every one it removes.
+    """
+
+    def __init__(self, interval: float = 300.0, batch_size: int = 500):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.purged_projects = 0
+        self.purged_documents = 0
+        self.expired_reminders = 0
+        self._wakeup = asyncio.Event()
+        self._db: AsyncIOMotorDatabase | None = None
+        self._task: asyncio.Task | None = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def _delete_children(self, db: AsyncIOMotorDatabase, col: str, project_oid: ObjectId) -> None:
+        while True:
+            cur = db[col].find({"project_id": project_oid}, {"_id": 1}).limit(self.batch_size)
+            ids = [d["_id"] async for d in cur]
+            if not ids:
+                return
+            res = await db[col].delete_many({"_id": {"$in": ids}})
+            self.purged_documents += res.deleted_count
+
+    async def purge_project(self, db: AsyncIOMotorDatabase, project_oid: ObjectId) -> None:
+        await self._delete_children(db, REMINDERS_COL, project_oid)
+        await self._delete_children(db, STEP_PROGRESS_COL, project_oid)
+        res = await db[PROJECTS_COL].delete_one({"_id": project_oid, "deleted_at": {"$exists": True}})
+        self.purged_projects += res.deleted_count
+
+    async def purge_deleted(self, db: AsyncIOMotorDatabase) -> int:
+        purged = 0
+        while True:
+            cur = db[PROJECTS_COL].find({"deleted_at": {"$exists": True}}, {"_id": 1}).limit(self.batch_size)
+            ids = [d["_id"] async for d in cur]
+            if not ids:
+                return purged
+            for project_oid in ids:
+                await self.purge_project(db, project_oid)
+            purged += len(ids)
+
+    async def expire_reminders(self, db: AsyncIOMotorDatabase) -> int:
+        cutoff = utcnow() - timedelta(days=settings.reminder_retention_days)
+        expired = 0
+        while True:
+            cur = (
+                db[REMINDERS_COL]
+                .find({"sent": True, "sent_at": {"$lt": cutoff}}, {"user_id": 1})
+                .limit(self.batch_size)
+            )
+            docs = [d async for d in cur]
+            if not docs:
+                return expired
+            # Tombstones first: a pass interrupted in between only repeats the deletes.
+            await record_deletions(db, "reminder", [(d["user_id"], str(d["_id"])) for d in docs])
+            res = await db[REMINDERS_COL].delete_many({"_id": {"$in": [d["_id"] for d in docs]}})
+            self.expired_reminders += res.deleted_count
+            expired += res.deleted_count
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.purge_deleted(self._db)
+                await self.expire_reminders(self._db)
+            except Exception:
+                logger.exception("project purge failed")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        self._db = db
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "purged_projects": self.purged_projects,
+            "purged_documents": self.purged_documents,
+            "expired_reminders": self.expired_reminders,
+        }
+
+
+purger = ProjectPurger(interval=settings.purge_interval_seconds, batch_size=settings.purge_batch_size)
@@ -0,0 +1,226 @@
+import asyncio
+import heapq
+import logging
+import os
+import socket
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.cache import project_views
+from app.services.mongo import naive_utc, utcnow
+from app.services.projects import PROJECTS_COL, REMINDERS_COL
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderSender(ABC):
+    @abstractmethod
+    async def send(self, reminder: dict[str, Any]) -> None:
+        """Delivers one reminder; raising leaves it to be retried once its claim expires."""
+
+
+class LogReminderSender(ReminderSender):
+    async def send(self, reminder: dict[str, Any]) -> None:
+        logger.info(
+            "reminder %s for user %s (project %s step %s): %s",
+            reminder["_id"],
+            reminder.get("user_id"),
+            reminder.get("project_id"),
+            reminder.get("step_number"),
+            reminder.get("message"),
+        )
+
+
+class MemoryReminderSender(ReminderSender):
+    def __init__(self):
+        self.sent: list[dict[str, Any]] = []
+
+    async def send(self, reminder: dict[str, Any]) -> None:
+        self.sent.append(reminder)
+
+
+SENDERS: dict[str, type[ReminderSender]] = {
+    "log": LogReminderSender,
+    "memory": MemoryReminderSender,
+}
+
+
+class ReminderDispatcher:
+    """Delivers due reminders.
+
+    Upcoming deadlines are kept in a min-heap so the worker sleeps until the
+    next one (or `max_idle` to pick up reminders created by other processes).
+    Due reminders are claimed in batches by stamping a per-batch claim id with
+    a lease; a claim only succeeds on documents that are unsent and unclaimed
+    (or whose lease expired), so several workers can run side by side.
+    """
+
+    def __init__(
+        self,
+        sender: ReminderSender,
+        batch_size: int = 100,
+        claim_ttl: float = 300.0,
+        max_idle: float = 60.0,
+        heap_size: int = 1000,
+        worker_id: str | None = None,
+    ):
+        self.sender = sender
+        self.batch_size = batch_size
+        self.claim_ttl = claim_ttl
+        self.max_idle = max_idle
+        self.heap_size = heap_size
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.sent_count = 0
+        self.failed_count = 0
+        self._heap: list[datetime] = []
+        self._wakeup = asyncio.Event()
+        self._db: AsyncIOMotorDatabase | None = None
+        self._task: asyncio.Task | None = None
+
+    def notify(self, remind_at: datetime) -> None:
+        heapq.heappush(self._heap, naive_utc(remind_at))
+        if len(self._heap) > self.heap_size * 2:
+            self._heap = heapq.nsmallest(self.heap_size, self._heap)
+        self._wakeup.set()
+
+    async def _load_upcoming(self, db: AsyncIOMotorDatabase) -> None:
+        cur = (
+            db[REMINDERS_COL]
+            .find({"sent": False, "remind_at": {"$gt": utcnow()}}, {"remind_at": 1, "_id": 0})
+            .sort("remind_at", 1)
+            .limit(self.heap_size)
+        )
+        self._heap = [r["remind_at"] async for r in cur]
+        heapq.heapify(self._heap)
+
+    async def claim_batch(self, db: AsyncIOMotorDatabase) -> tuple[ObjectId, list[dict[str, Any]]]:
+        now = utcnow()
+        claimable = {
+            "sent": False,
+            "remind_at": {"$lte": now},
+            "$or": [{"claimed_until": None}, {"claimed_until": {"$lt": now}}],
+        }
+        cur = db[REMINDERS_COL].find(claimable, {"_id": 1}).sort("remind_at", 1).limit(self.batch_size)
+        ids = [r["_id"] async for r in cur]
+        claim_id = ObjectId()
+        if not ids:
+            return claim_id, []
+        # The filter is re-evaluated per document, so a reminder another worker
+        # claimed in the meantime is simply not matched here.
+        await db[REMINDERS_COL].update_many(
+            {**claimable, "_id": {"$in": ids}},
+            {
+                "$set": {
+                    "claim_id": claim_id,
+                    "claimed_by": self.worker_id,
+                    "claimed_until": now + timedelta(seconds=self.claim_ttl),
+                }
+            },
+        )
+        claimed = await db[REMINDERS_COL].find({"claim_id": claim_id}).to_list(length=None)
+        return claim_id, claimed
+
+    async def dispatch_due(self, db: AsyncIOMotorDatabase) -> int:
+        total = 0
+        while True:
+            claim_id, batch = await self.claim_batch(db)
+            if not batch:
+                return total
+            delivered: list[ObjectId] = []
+            for reminder in batch:
+                try:
+                    await self.sender.send(reminder)
+                    delivered.append(reminder["_id"])
+                except Exception:
+                    self.failed_count += 1
+                    logger.exception("reminder %s delivery failed", reminder["_id"])
+            if delivered:
+                now = utcnow()
+                await db[REMINDERS_COL].update_many(
+                    {"_id": {"$in": delivered}, "claim_id": claim_id},
+                    {
+                        "$set": {"sent": True, "sent_at": now, "updated_at": now},
+                        "$unset": {"claim_id": "", "claimed_by": "", "claimed_until": ""},
+                    },
+                )
+                # Project views show the sent flag, so their ETags must change too.
+                project_ids = list({r["project_id"] for r in batch if r["_id"] in delivered})
+                await db[PROJECTS_COL].update_many({"_id": {"$in": project_ids}}, {"$inc": {"version": 1}})
+                for project_oid in project_ids:
+                    await project_views.invalidate(str(project_oid))
+            # Failed deliveries keep their lease and are retried once it expires.
+            self.sent_count += len(delivered)
+            total += len(delivered)
+            if len(batch) < self.batch_size:
+                return total
+
+    def _drop_until(self, ts: datetime) -> None:
+        while self._heap and self._heap[0] <= ts:
+            heapq.heappop(self._heap)
+
+    def _seconds_until_next(self) -> float:
+        # A deadline that is already due means no sleep at all.
+        if not self._heap:
+            return self.max_idle
+        return max(0.0, min(self.max_idle, (self._heap[0] - utcnow()).total_seconds()))
+
+    async def _sleep(self) -> None:
+        # Sleep until the next known deadline; notify() cuts the wait short when
+        # a nearer reminder shows up.
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_next())
+            except asyncio.TimeoutError:
+                return
+            if self._heap and self._heap[0] <= utcnow():
+                return
+
+    async def _run(self) -> None:
+        while True:
+            started = utcnow()
+            try:
+                await self.dispatch_due(self._db)
+                await self._load_upcoming(self._db)
+            except Exception:
+                logger.exception("reminder dispatch failed")
+            # Deadlines reached before this pass began were covered by it, so only
+            # those due since then cut the next sleep short.
+            self._drop_until(started)
+            await self._sleep()
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        self._db = db
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "upcoming": len(self._heap),
+            "sent": self.sent_count,
+            "failed": self.failed_count,
+        }
+
+
+dispatcher = ReminderDispatcher(
+    sender=SENDERS[settings.reminder_sender](),
+    batch_size=settings.reminder_batch_size,
+    claim_ttl=settings.reminder_claim_ttl_seconds,
+    max_idle=settings.reminder_max_idle_seconds,
+)
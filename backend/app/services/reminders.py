@@ -3,8 +3,24 @@ from typing import Any
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.core.db import for_reads
+from app.services.events import broker
 from app.services.mongo import oid, utcnow
-from app.services.projects import PROJECTS_COL, REMINDERS_COL, STEP_PROGRESS_COL
+from app.services.projects import PROJECTS_COL, REMINDERS_COL, owned_project_query, touch_project
+from app.services.reminder_dispatcher import dispatcher
+
+
+# What GET /reminders returns; the dispatcher's claim fields stay internal.
+REMINDER_LIST_FIELDS = {
+    "project_id": 1,
+    "step_number": 1,
+    "remind_at": 1,
+    "message": 1,
+    "sent": 1,
+    "sent_at": 1,
+    "created_at": 1,
+    "updated_at": 1,
+}
 
 
 def _oid_or_none(id_str: str) -> ObjectId | None:
@@ -33,11 +49,12 @@ async def create_reminder(
     if not project_oid:
         return None
 
-    proj = await db[PROJECTS_COL].find_one({"_id": project_oid, "user_id": user_id})
+    proj = await db[PROJECTS_COL].find_one(owned_project_query(project_oid, user_id), {"_id": 1})
     if not proj:
         return None
 
     reminder_id = oid()
+    now = utcnow()
     doc = {
         "_id": reminder_id,
         "user_id": user_id,
@@ -46,30 +63,36 @@ async def create_reminder(
         "remind_at": remind_at,
         "message": message,
         "sent": False,
-        "created_at": utcnow(),
+        "created_at": now,
+        "updated_at": now,
     }
     await db[REMINDERS_COL].insert_one(doc)
 
-    # Also embed into step_progress for convenience in the project view response
-    await db[STEP_PROGRESS_COL].update_one(
-        {"project_id": project_oid, "step_number": int(step_number)},
-        {
-            "$push": {
-                "reminders": {
-                    "id": str(reminder_id),
-                    "remind_at": remind_at,
-                    "message": message,
-                    "sent": False,
-                }
-            }
-        },
-        upsert=True,
-    )
+    await touch_project(db, project_oid)
+    dispatcher.notify(remind_at)
 
-    return _to_str_id(doc)
+    reminder = _to_str_id(doc)
+    await broker.publish(
+        user_id,
+        "reminder",
+        {k: reminder[k] for k in ("id", "project_id", "step_number", "remind_at", "message", "sent")},
+    )
+    return reminder
 
 
 async def list_reminders(db: AsyncIOMotorDatabase, user_id: str) -> list[dict[str, Any]]:
-    cur = db[REMINDERS_COL].find({"user_id": user_id}).sort("remind_at", 1)
+    cur = for_reads(db)[REMINDERS_COL].find({"user_id": user_id}, REMINDER_LIST_FIELDS).sort("remind_at", 1)
     return [_to_str_id(r) async for r in cur]
 
+
+async def list_project_reminders(db: AsyncIOMotorDatabase, project_oid: ObjectId) -> dict[int, list[dict[str, Any]]]:
+    # On the primary, like the rest of the project view it is part of.
+    cur = db[REMINDERS_COL].find(
+        {"project_id": project_oid}, {"step_number": 1, "remind_at": 1, "message": 1, "sent": 1}
+    ).sort("remind_at", 1)
+    by_step: dict[int, list[dict[str, Any]]] = {}
+    async for r in cur:
+        by_step.setdefault(int(r["step_number"]), []).append(
+            {"id": str(r["_id"]), "remind_at": r["remind_at"], "message": r["message"], "sent": r.get("sent", False)}
+        )
+    return by_step
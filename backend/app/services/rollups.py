@@ -0,0 +1,116 @@
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.services.mongo import naive_utc, utcnow
+from app.services.steps import DEFAULT_TEMPLATE, StepTemplate, templates
+
+# One document per user (_id = uid):
+#   phases.<phase>.<status>       number of steps in that phase with that status
+#   weeks.<YYYY-Www>              steps completed in that ISO week
+#   durations.<step>.count/seconds  completed steps and their summed time from
+#                                   project creation to completion
+# Writes only $inc documents that already exist; a missing or stale rollup is
+# built in full by app.services.analytics on first read or by the backfill job.
+ROLLUPS_COL = "progress_rollups"
+
+OTHER_PHASE = "Other"
+
+
+def _template(name: str | None) -> StepTemplate:
+    try:
+        return templates.get(name or DEFAULT_TEMPLATE)
+    except KeyError:
+        return templates.get()
+
+
+def phase_key(tpl: StepTemplate, step_number: int) -> str:
+    step = tpl.step(step_number)
+    phase = str((step or {}).get("phase") or OTHER_PHASE)
+    # Field names may not contain dots or start with "$".
+    return phase.replace(".", "_").lstrip("$") or OTHER_PHASE
+
+
+def week_key(ts: datetime) -> str:
+    year, week, _ = ts.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _ms(ts: datetime) -> datetime:
+    # Writers see some timestamps before they are stored: BSON keeps milliseconds
+    # and naive UTC, while a client's completed_at may carry an offset.
+    ts = naive_utc(ts)
+    return ts.replace(microsecond=ts.microsecond // 1000 * 1000)
+
+
+def _completion(status: str | None, completed_at: Any) -> datetime | None:
+    return _ms(completed_at) if status == "completed" and isinstance(completed_at, datetime) else None
+
+
+def step_increments(
+    project: dict[str, Any], previous: dict[str, Any] | None, step: dict[str, Any], inc: dict[str, float]
+) -> None:
+    """Adds the rollup change for one step going from `previous` to `step` into `inc`.
+
+    `previous` is None for a step that did not exist before.
+    """
+    tpl = _template(project.get("template"))
+    n = int(step["step_number"])
+    phase = phase_key(tpl, n)
+    old_status = (previous or {}).get("status")
+    new_status = step.get("status") or "not_started"
+    if old_status != new_status:
+        if old_status is not None:
+            inc[f"phases.{phase}.{old_status}"] = inc.get(f"phases.{phase}.{old_status}", 0) - 1
+        inc[f"phases.{phase}.{new_status}"] = inc.get(f"phases.{phase}.{new_status}", 0) + 1
+
+    old_done = _completion(old_status, (previous or {}).get("completed_at"))
+    new_done = _completion(new_status, step.get("completed_at"))
+    if old_done == new_done:
+        return
+    created_at = project.get("created_at")
+    for done, sign in ((old_done, -1), (new_done, 1)):
+        if done is None:
+            continue
+        week = f"weeks.{week_key(done)}"
+        inc[week] = inc.get(week, 0) + sign
+        if isinstance(created_at, datetime):
+            seconds = max(0.0, (done - _ms(created_at)).total_seconds())
+            inc[f"durations.{n}.count"] = inc.get(f"durations.{n}.count", 0) + sign
+            inc[f"durations.{n}.seconds"] = inc.get(f"durations.{n}.seconds", 0) + sign * seconds
+
+
+async def _apply(db: AsyncIOMotorDatabase, user_id: str, inc: dict[str, float]) -> None:
+    inc = {k: v for k, v in inc.items() if v}
+    if inc:
+        await db[ROLLUPS_COL].update_one(
+            {"_id": user_id}, {"$inc": {**inc, "rev": 1}, "$set": {"updated_at": utcnow()}}
+        )
+
+
+async def record_step_changes(
+    db: AsyncIOMotorDatabase, user_id: str, project: dict[str, Any], steps: Iterable[dict[str, Any]]
+) -> None:
+    # Each step carries its pre-write state under "previous", as the step writers return it.
+    inc: dict[str, float] = {}
+    for step in steps:
+        previous = step.get("previous") or {}
+        step_increments(project, previous if previous.get("status") is not None else None, step, inc)
+    await _apply(db, user_id, inc)
+
+
+async def record_project_created(db: AsyncIOMotorDatabase, user_id: str, project: dict[str, Any]) -> None:
+    tpl = _template(project.get("template"))
+    inc: dict[str, float] = {}
+    for step in tpl.steps:
+        key = f"phases.{phase_key(tpl, int(step['number']))}.not_started"
+        inc[key] = inc.get(key, 0) + 1
+    await _apply(db, user_id, inc)
+
+
+async def mark_stale(db: AsyncIOMotorDatabase, user_id: str) -> None:
+    # For bulk changes (deletes, imports): the next read rebuilds the rollup. Bumping
+    # rev also makes a rebuild already in flight discard its result and start over.
+    await db[ROLLUPS_COL].update_one({"_id": user_id}, {"$set": {"stale": True}, "$inc": {"rev": 1}})
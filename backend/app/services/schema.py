@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.services.mongo import utcnow
+from app.services.projects import INDEX_VERSION, ensure_indexes
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_COL = "schema"
+INDEXES_ID = "indexes"
+# A worker that dies mid-build holds the claim at most this long.
+CLAIM_SECONDS = 600
+
+
+def index_signature() -> dict[str, Any]:
+    # Everything ensure_indexes depends on: a change to any of it means a rebuild.
+    return {
+        "version": INDEX_VERSION,
+        "sync_tombstone_retention_days": settings.sync_tombstone_retention_days,
+        "search_language": settings.search_language,
+        "events_retention_seconds": (
+            settings.events_retention_seconds if settings.events_backend == "change_stream" else None
+        ),
+    }
+
+
+async def migrate_indexes(db: AsyncIOMotorDatabase, force: bool = False) -> bool:
+    """Builds the indexes unless the stored signature already matches; True if it ran.
+
+    Only one process builds at a time; the others see the claim and return. A
+    deployment older than the stored version never downgrades.
+    """
+    col = db[SCHEMA_COL]
+    signature = index_signature()
+    current = await col.find_one({"_id": INDEXES_ID})
+    if current and not force:
+        applied = current.get("applied") or {}
+        if applied == signature or applied.get("version", 0) > INDEX_VERSION:
+            return False
+
+    now = utcnow()
+    try:
+        await col.update_one(
+            {"_id": INDEXES_ID, "$or": [{"claimed_until": None}, {"claimed_until": {"$lt": now}}]},
+            {"$set": {"claimed_until": now + timedelta(seconds=CLAIM_SECONDS)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # Claimed by another process that is building them now.
+        return False
+    try:
+        await ensure_indexes(db)
+        await col.update_one({"_id": INDEXES_ID}, {"$set": {"applied": signature, "applied_at": utcnow()}})
+    finally:
+        await col.update_one({"_id": INDEXES_ID}, {"$set": {"claimed_until": None}})
+    return True
+
+
+class IndexMigration:
+    """Runs migrate_indexes in the background so worker startup never waits on it."""
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    async def _run(self, db: AsyncIOMotorDatabase) -> None:
+        try:
+            if await migrate_indexes(db):
+                logger.info("indexes built for version %s", INDEX_VERSION)
+        except Exception:
+            logger.exception("index migration failed; will retry on next start")
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+index_migration = IndexMigration()
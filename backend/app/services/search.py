@@ -0,0 +1,131 @@
+import asyncio
+import base64
+import json
+import re
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.db import for_reads
+from app.services.projects import PROJECTS_COL, STEP_PROGRESS_COL
+
+# Ranking needs every hit up to the requested page, so paging stops here to keep
+# each search a bounded index scan however many notes a user has.
+MAX_RESULTS = 200
+SNIPPET_CHARS = 160
+
+_SCORE = {"$meta": "textScore"}
+
+
+def _encode_offset(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([offset]).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_offset(token: str) -> int:
+    try:
+        (offset,) = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return max(0, int(offset))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _terms(query: str) -> list[str]:
+    # The words of a $text search, without its quote and negation syntax.
+    return [t for t in re.findall(r"\w+", query.lower()) if len(t) > 1]
+
+
+def snippet(text: str, terms: list[str], width: int = SNIPPET_CHARS) -> str:
+    """About `width` characters of `text` around the first matching term."""
+    lower = text.lower()
+    found = [i for i in (lower.find(t) for t in terms) if i >= 0]
+    # A stemmed match may not appear verbatim; the start of the text stands in.
+    start = max(0, min(found) - width // 4) if found else 0
+    end = start + width
+    return ("…" if start else "") + text[start:end].strip() + ("…" if end < len(text) else "")
+
+
+def _top_score(docs: list[dict[str, Any]]) -> float:
+    return max((d["score"] for d in docs), default=0.0) or 1.0
+
+
+def _matched_field(doc: dict[str, Any], fields: tuple[str, ...], terms: list[str]) -> str:
+    for f in fields:
+        value = (doc.get(f) or "").lower()
+        if any(t in value for t in terms):
+            return f
+    return next((f for f in fields if doc.get(f)), fields[0])
+
+
+async def search(
+    db: AsyncIOMotorDatabase, user_id: str, query: str, limit: int = 20, after: str | None = None
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Projects and step notes matching `query`, best first, as snippets.
+
+    Step notes are searched in STEP_PROGRESS_COL; embedded-storage projects are
+    matched on name and description only. Raises ValueError for a bad cursor.
+    """
+    offset = _decode_offset(after) if after else 0
+    if offset >= MAX_RESULTS:
+        return [], None
+    want = min(offset + limit, MAX_RESULTS) + 1
+    rdb = for_reads(db)
+    text = {"$search": query}
+    projects, steps = await asyncio.gather(
+        rdb[PROJECTS_COL]
+        .find(
+            {"user_id": user_id, "deleted_at": None, "$text": text},
+            {"name": 1, "description": 1, "score": _SCORE},
+        )
+        .sort([("score", _SCORE)])
+        .limit(want)
+        .to_list(length=want),
+        rdb[STEP_PROGRESS_COL]
+        .find({"user_id": user_id, "$text": text}, {"project_id": 1, "step_number": 1, "notes": 1, "score": _SCORE})
+        .sort([("score", _SCORE)])
+        .limit(want)
+        .to_list(length=want),
+    )
+
+    names = {p["_id"]: p.get("name") or "" for p in projects}
+    missing = list({s["project_id"] for s in steps} - names.keys())
+    if missing:
+        # Also drops hits from deleted projects whose steps are not purged yet.
+        cur = rdb[PROJECTS_COL].find({"_id": {"$in": missing}, "user_id": user_id, "deleted_at": None}, {"name": 1})
+        names.update({p["_id"]: p.get("name") or "" async for p in cur})
+    steps = [s for s in steps if s["project_id"] in names]
+
+    # textScore scales with each index's field weights (project name 10 and
+    # description 3, notes 1), so raw scores from the two indexes are not
+    # comparable: each source is scaled to its own best hit before merging.
+    project_top, step_top = _top_score(projects), _top_score(steps)
+    terms = _terms(query)
+    hits = []
+    for p in projects:
+        field = _matched_field(p, ("name", "description"), terms)
+        hits.append(
+            {
+                "kind": "project",
+                "project_id": str(p["_id"]),
+                "project_name": names[p["_id"]],
+                "step_number": None,
+                "field": field,
+                "snippet": snippet(p.get(field) or "", terms),
+                "score": p["score"] / project_top,
+            }
+        )
+    for s in steps:
+        hits.append(
+            {
+                "kind": "step",
+                "project_id": str(s["project_id"]),
+                "project_name": names[s["project_id"]],
+                "step_number": int(s["step_number"]),
+                "field": "notes",
+                "snippet": snippet(s.get("notes") or "", terms),
+                "score": s["score"] / step_top,
+            }
+        )
+    hits.sort(key=lambda h: (-h["score"], h["project_id"], h["step_number"] or 0))
+    end = min(offset + limit, MAX_RESULTS)
+    next_cursor = _encode_offset(end) if len(hits) > end and end < MAX_RESULTS else None
+    return hits[offset:end], next_cursor
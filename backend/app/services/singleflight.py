@@ -0,0 +1,46 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one in-flight call.
+
+    The call runs as its own task and every caller awaits it through a shield,
+    so a caller that is cancelled (e.g. its client disconnected) leaves the call
+    running for the others. Results are shared, not copied: callers must not
+    mutate them. Keys should include whatever generation a write bumps, so a
+    read issued after a write never joins a call that started before it.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.shared = 0
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the outcome retrieved even if every caller was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, Any]:
+        return {"leaders": self.leaders, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+# Identical concurrent reads of project data, keyed by (route, user_id, params, generation).
+reads = SingleFlight()
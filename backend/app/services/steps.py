@@ -1,10 +1,24 @@
+import asyncio
+import gzip
+import hashlib
 import json
-from functools import lru_cache
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 from urllib.parse import quote_plus
 
+import brotli
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE = "default"
 DATA_PATH = Path(__file__).resolve().parents[1] / "data" / "steps.json"
+# Additional templates: data/templates/<name>.json, same format as steps.json.
+TEMPLATES_DIR = DATA_PATH.parent / "templates"
 
 
 def _fallback_steps() -> list[dict]:
@@ -33,32 +47,193 @@ def _fallback_steps() -> list[dict]:
     ]
 
 
-@lru_cache(maxsize=1)
-def get_steps() -> list[dict]:
+def _with_resources(step: dict) -> dict:
+    # Ensure minimum resource coverage so the UI always has something useful to show.
+    s = {
+        **step,
+        "resources": list(step.get("resources") or []),
+        "external_links": list(step.get("external_links") or []),
+    }
+    if not s["resources"] and not s["external_links"]:
+        q = quote_plus(f'{s.get("title","step")} app')
+        s["resources"] = [
+            {
+                "id": f's{s.get("number","x")}_auto_yt',
+                "type": "video",
+                "title": f'YouTube: {s.get("title","Step")}',
+                "url": f"https://www.youtube.com/results?search_query={q}",
+                "description": "Quick starting point — replace with your preferred resource.",
+            }
+        ]
+    return s
+
+
+def _load_steps(path: Path) -> list[dict]:
     try:
-        raw = json.loads(DATA_PATH.read_text(encoding="utf-8"))
-        if isinstance(raw, dict) and "steps" in raw:
-            raw = raw["steps"]
-        if not isinstance(raw, list):
-            return _fallback_steps()
-        steps = raw
+        raw = json.loads(path.read_text(encoding="utf-8"))
     except FileNotFoundError:
-        steps = _fallback_steps()
+        return _fallback_steps()
+    if isinstance(raw, dict) and "steps" in raw:
+        raw = raw["steps"]
+    if not isinstance(raw, list):
+        return _fallback_steps()
+    return [_with_resources(s) for s in raw]
+
+
+def _template_sources() -> dict[str, Path]:
+    sources = {DEFAULT_TEMPLATE: DATA_PATH}
+    if TEMPLATES_DIR.is_dir():
+        for path in sorted(TEMPLATES_DIR.glob("*.json")):
+            sources.setdefault(path.stem, path)
+    return sources
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+@dataclass(frozen=True)
+class StepsCatalog:
+    version: str
+    body: bytes
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class StepTemplate:
+    """One loaded version of a named template. Treat the step dicts as read-only."""
+
+    name: str
+    version: str
+    steps: tuple[dict, ...]
+    by_number: dict[int, dict]
+    catalog: StepsCatalog
+
+    def step(self, number: int) -> dict | None:
+        return self.by_number.get(number)
+
+
+def _build_template(name: str, steps: list[dict]) -> StepTemplate:
+    canonical = json.dumps(steps, sort_keys=True, separators=(",", ":"), default=str)
+    version = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+    body = json.dumps(steps, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    encoded = {"gzip": gzip.compress(body, compresslevel=9), "br": brotli.compress(body, quality=11)}
+    return StepTemplate(
+        name=name,
+        version=version,
+        steps=tuple(steps),
+        by_number={int(s["number"]): s for s in steps if "number" in s},
+        catalog=StepsCatalog(version=version, body=body, encoded=encoded),
+    )
+
+
+class TemplateRegistry:
+    """Named step templates, reloaded when their files change.
+
+    A reload parses and pre-compresses changed files in a worker thread and then
+    swaps the whole name -> template mapping in one assignment, so requests never
+    wait on it and never see a half-built template. A file that fails to parse
+    (e.g. caught mid-write) keeps its previous version and is retried next poll.
+    """
+
+    def __init__(self, sources: Callable[[], dict[str, Path]] = _template_sources, interval: float = 5.0):
+        self._sources = sources
+        self.interval = interval
+        self.reloads = 0
+        self.reload_errors = 0
+        self._templates: dict[str, StepTemplate] = {}
+        self._signatures: dict[str, tuple[int, int] | None] = {}
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    def get(self, name: str = DEFAULT_TEMPLATE) -> StepTemplate:
+        """Current version of a template; raises KeyError for unknown names.
+
+        The server loads templates at startup; only callers that skipped load()
+        (scripts, migrations) pay for the first load here, inline.
+        """
+        templates = self._templates
+        if not templates:
+            self.reload()
+            templates = self._templates
+        return templates[name]
+
+    def all(self) -> list[StepTemplate]:
+        if not self._templates:
+            self.reload()
+        return list(self._templates.values())
+
+    def reload(self) -> bool:
+        with self._lock:
+            sources = self._sources()
+            templates: dict[str, StepTemplate] = {}
+            signatures: dict[str, tuple[int, int] | None] = {}
+            changed = set(sources) != set(self._templates)
+            for name, path in sources.items():
+                current = self._templates.get(name)
+                sig = _signature(path)
+                if current is not None and self._signatures.get(name) == sig:
+                    templates[name], signatures[name] = current, sig
+                    continue
+                try:
+                    template = _build_template(name, _load_steps(path))
+                except (OSError, ValueError, KeyError, TypeError):
+                    self.reload_errors += 1
+                    logger.exception("could not load step template %r from %s", name, path)
+                    if current is None and name == DEFAULT_TEMPLATE:
+                        current = _build_template(name, _fallback_steps())
+                    if current is not None:
+                        templates[name], signatures[name] = current, self._signatures.get(name)
+                    continue
+                if current is not None and current.version == template.version:
+                    template = current
+                else:
+                    changed = True
+                templates[name], signatures[name] = template, sig
+            self._templates, self._signatures = templates, signatures
+            if changed:
+                self.reloads += 1
+            return changed
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if await asyncio.to_thread(self.reload):
+                    logger.info("step templates reloaded: %s", {n: t.version for n, t in self._templates.items()})
+            except Exception:
+                logger.exception("step template reload failed")
+
+    async def load(self) -> None:
+        # Parsing and brotli/gzip pre-compression take long enough to stall the
+        # event loop, so the first load runs in a worker thread too.
+        if not self._templates:
+            await asyncio.to_thread(self.reload)
+
+    def start(self) -> None:
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {"templates": len(self._templates), "reloads": self.reloads, "reload_errors": self.reload_errors}
+
+
+templates = TemplateRegistry(interval=settings.steps_reload_interval_seconds)
 
-    # Ensure minimum resource coverage so the UI always has something useful to show.
-    for s in steps:
-        s.setdefault("resources", [])
-        s.setdefault("external_links", [])
-        if not s["resources"] and not s["external_links"]:
-            q = quote_plus(f'{s.get("title","step")} app')
-            s["resources"] = [
-                {
-                    "id": f's{s.get("number","x")}_auto_yt',
-                    "type": "video",
-                    "title": f'YouTube: {s.get("title","Step")}',
-                    "url": f"https://www.youtube.com/results?search_query={q}",
-                    "description": "Quick starting point — replace with your preferred resource.",
-                }
-            ]
-    return steps
 
+def get_steps_catalog(name: str = DEFAULT_TEMPLATE) -> StepsCatalog:
+    return templates.get(name).catalog
@@ -0,0 +1,25 @@
+import secrets
+from datetime import timedelta
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.mongo import utcnow
+
+# Single-use tickets that let a browser EventSource, which cannot send headers,
+# open GET /events without putting the Firebase ID token in the URL. Expired
+# ones are removed by a TTL index on expires_at.
+STREAM_TICKETS_COL = "stream_tickets"
+
+
+async def issue_stream_ticket(db: AsyncIOMotorDatabase, user_id: str) -> str:
+    ticket = secrets.token_urlsafe(32)
+    expires_at = utcnow() + timedelta(seconds=settings.events_ticket_ttl_seconds)
+    await db[STREAM_TICKETS_COL].insert_one({"_id": ticket, "user_id": user_id, "expires_at": expires_at})
+    return ticket
+
+
+async def redeem_stream_ticket(db: AsyncIOMotorDatabase, ticket: str) -> str | None:
+    """The ticket's user id, consuming it; None if it is unknown, used or expired."""
+    doc = await db[STREAM_TICKETS_COL].find_one_and_delete({"_id": ticket, "expires_at": {"$gt": utcnow()}})
+    return doc["user_id"] if doc else None
@@ -0,0 +1,113 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.services.projects import (
+    PROJECT_LIST_FIELDS,
+    PROJECTS_COL,
+    REMINDERS_COL,
+    STEP_PROGRESS_COL,
+    embedded_step_progress,
+)
+from app.services.mongo import utcnow
+from app.services.notes import read_notes
+from app.services.tombstones import RESET, TOMBSTONES_COL
+
+# Watermarks trail the server clock by this much, so a write stamped just
+# before a sync but committed after it is picked up by the next one. Clients
+# may see such a record twice and apply it idempotently.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+STEP_SYNC_FIELDS = ("step_number", "status", "progress_percent", "completed_at", "updated_at")
+REMINDER_SYNC_FIELDS = ("step_number", "remind_at", "message", "sent", "updated_at")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_watermark(ts: datetime) -> str:
+    ms = (ts - _EPOCH) // timedelta(milliseconds=1)
+    return base64.urlsafe_b64encode(json.dumps([ms]).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_watermark(token: str) -> datetime:
+    try:
+        (ms,) = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return _EPOCH + timedelta(milliseconds=int(ms))
+    except Exception as e:
+        raise ValueError("Invalid sync token") from e
+
+
+def _step(project_id: Any, s: dict[str, Any]) -> dict[str, Any]:
+    return {"project_id": str(project_id), **{f: s.get(f) for f in STEP_SYNC_FIELDS}, "notes": read_notes(s)}
+
+
+async def get_changes(db: AsyncIOMotorDatabase, user_id: str, since: str | None) -> dict[str, Any]:
+    """Everything the user's records gained or lost since the `since` watermark.
+
+    Without a usable watermark, or when the delta is larger than a refetch,
+    the answer is just `reset` and a fresh watermark: the client reloads through
+    the regular endpoints and syncs from there. Raises ValueError for a
+    malformed token.
+    """
+    started = utcnow()
+    result: dict[str, Any] = {
+        "watermark": encode_watermark(started - SYNC_OVERLAP),
+        "reset": True,
+        "projects": [],
+        "steps": [],
+        "reminders": [],
+        "deleted": [],
+    }
+    if since is None:
+        return result
+    ts = decode_watermark(since)
+    if ts < started - timedelta(days=settings.sync_tombstone_retention_days):
+        # Deletions that old may already have expired from the tombstones.
+        return result
+
+    # Primary reads: a client syncing right after its own write must see it.
+    changed = {"$gte": ts}
+    cap = settings.sync_max_changes
+    tombstones, projects, step_docs, reminders = await asyncio.gather(
+        db[TOMBSTONES_COL].find({"user_id": user_id, "deleted_at": changed}, {"kind": 1, "id": 1}).to_list(cap + 1),
+        db[PROJECTS_COL]
+        .find(
+            {"user_id": user_id, "deleted_at": None, "updated_at": changed},
+            {**PROJECT_LIST_FIELDS, "storage": 1, "steps": 1},
+        )
+        .to_list(cap + 1),
+        db[STEP_PROGRESS_COL].find({"user_id": user_id, "updated_at": changed}).to_list(cap + 1),
+        db[REMINDERS_COL].find({"user_id": user_id, "updated_at": changed}).to_list(cap + 1),
+    )
+    if any(t["kind"] == RESET for t in tombstones) or (
+        len(tombstones) + len(projects) + len(step_docs) + len(reminders) > cap
+    ):
+        return result
+
+    deleted = {t["id"] for t in tombstones}
+    steps = [_step(s["project_id"], s) for s in step_docs if str(s["project_id"]) not in deleted]
+    for p in projects:
+        # Embedded steps carry their own stamps inside the changed project.
+        for s in embedded_step_progress(p) or ():
+            if s.get("updated_at") and s["updated_at"] >= ts:
+                steps.append(_step(p["_id"], s))
+        p.pop("storage", None)
+        p.pop("steps", None)
+        p["id"] = str(p.pop("_id"))
+    result.update(
+        reset=False,
+        projects=projects,
+        steps=steps,
+        reminders=[
+            {"id": str(r["_id"]), "project_id": str(r["project_id"]), **{f: r.get(f) for f in REMINDER_SYNC_FIELDS}}
+            for r in reminders
+            if str(r["project_id"]) not in deleted
+        ],
+        deleted=[{"kind": t["kind"], "id": t["id"]} for t in tombstones],
+    )
+    return result
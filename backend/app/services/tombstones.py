@@ -0,0 +1,25 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.services.mongo import utcnow
+
+# Deletions the sync endpoint reports to clients, kept for
+# SYNC_TOMBSTONE_RETENTION_DAYS. A "reset" entry marks a bulk change (an import)
+# after which clients must refetch everything instead of applying deltas.
+TOMBSTONES_COL = "sync_tombstones"
+RESET = "reset"
+
+
+async def record_deletion(db: AsyncIOMotorDatabase, user_id: str, kind: str, doc_id: str) -> None:
+    await db[TOMBSTONES_COL].insert_one({"user_id": user_id, "kind": kind, "id": doc_id, "deleted_at": utcnow()})
+
+
+async def record_deletions(db: AsyncIOMotorDatabase, kind: str, deleted: list[tuple[str, str]]) -> None:
+    # One tombstone per (user_id, doc_id) pair.
+    now = utcnow()
+    await db[TOMBSTONES_COL].insert_many(
+        [{"user_id": user_id, "kind": kind, "id": doc_id, "deleted_at": now} for user_id, doc_id in deleted]
+    )
+
+
+async def record_reset(db: AsyncIOMotorDatabase, user_id: str) -> None:
+    await db[TOMBSTONES_COL].insert_one({"user_id": user_id, "kind": RESET, "id": None, "deleted_at": utcnow()})
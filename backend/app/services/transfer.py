@@ -0,0 +1,273 @@
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from datetime import datetime
+from typing import Any, get_args
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.api.encoding import dumps
+from app.core.config import settings
+from app.core.db import for_reads
+from app.models.projects import StepStatus
+from app.services import rollups
+from app.services.mongo import naive_utc, utcnow
+from app.services.notes import encode_notes, read_notes
+from app.services.steps import DEFAULT_TEMPLATE
+from app.services.tombstones import record_reset
+from app.services.projects import (
+    EMBEDDED_STORAGE,
+    PROJECTS_COL,
+    REMINDERS_COL,
+    STEP_PROGRESS_COL,
+    embedded_step_progress,
+)
+
+EXPORT_FORMAT_VERSION = 1
+
+PROJECT_FIELDS = ("name", "description", "template", "template_version", "created_at", "updated_at")
+STEP_FIELDS = ("step_number", "status", "progress_percent", "notes", "completed_at")
+REMINDER_FIELDS = ("step_number", "remind_at", "message", "sent", "sent_at", "created_at")
+STEP_STATUSES = set(get_args(StepStatus))
+DATETIME_FIELDS = {"created_at", "updated_at", "completed_at", "remind_at", "sent_at"}
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+class TransferError(ValueError):
+    def __init__(self, message: str, imported: dict[str, int] | None = None):
+        super().__init__(message)
+        # What an import had written before it failed.
+        self.imported = imported
+
+
+def _line(kind: str, data: dict[str, Any]) -> bytes:
+    return dumps({"type": kind, "data": data}) + b"\n"
+
+
+def _pick(doc: dict[str, Any], fields: tuple[str, ...]) -> dict[str, Any]:
+    return {f: doc[f] for f in fields if f in doc}
+
+
+def _step_line(project_id: Any, step: dict[str, Any]) -> bytes:
+    # Exports always carry the plain text, however the notes are stored.
+    return _line("step_progress", {"project_id": project_id, **_pick(step, STEP_FIELDS), "notes": read_notes(step)})
+
+
+async def export_user_data(db: AsyncIOMotorDatabase, user_id: str, chunk_size: int = 100) -> AsyncIterator[bytes]:
+    # Projects are streamed in chunks; each chunk's steps and reminders are
+    # fetched with one $in query apiece, so memory is bounded by chunk_size.
+    rdb = for_reads(db)
+    yield _line("meta", {"format": EXPORT_FORMAT_VERSION, "exported_at": utcnow()})
+    last_id: ObjectId | None = None
+    while True:
+        query: dict[str, Any] = {"user_id": user_id, "deleted_at": None}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        projects = await rdb[PROJECTS_COL].find(query).sort("_id", 1).limit(chunk_size).to_list(length=chunk_size)
+        if not projects:
+            return
+        ids = [p["_id"] for p in projects]
+        last_id = ids[-1]
+        for p in projects:
+            yield _line("project", {"id": p["_id"], **_pick(p, PROJECT_FIELDS)})
+            for s in embedded_step_progress(p) or ():
+                yield _step_line(p["_id"], s)
+        async for s in rdb[STEP_PROGRESS_COL].find({"project_id": {"$in": ids}}).sort([("project_id", 1), ("step_number", 1)]):
+            yield _step_line(s["project_id"], s)
+        async for r in rdb[REMINDERS_COL].find({"project_id": {"$in": ids}}).sort("_id", 1):
+            yield _line("reminder", {"project_id": r["project_id"], **_pick(r, REMINDER_FIELDS)})
+
+
+def _parse_datetimes(data: dict[str, Any]) -> dict[str, Any]:
+    for f in DATETIME_FIELDS & data.keys():
+        if data[f] is None:
+            continue
+        data[f] = naive_utc(datetime.fromisoformat(data[f]))
+    return data
+
+
+async def _lines(body: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    buf = b""
+    async for chunk in body:
+        buf += chunk
+        *complete, buf = buf.split(b"\n")
+        for line in complete:
+            if line.strip():
+                yield line
+        if len(buf) > MAX_LINE_BYTES:
+            raise TransferError("line too long")
+    if buf.strip():
+        yield buf
+
+
+class _Importer:
+    def __init__(self, db: AsyncIOMotorDatabase, user_id: str, chunk_size: int):
+        self.db = db
+        self.user_id = user_id
+        self.chunk_size = chunk_size
+        self.embedded = settings.project_storage == EMBEDDED_STORAGE
+        self.project_ids: dict[str, ObjectId] = {}
+        self.progress: dict[ObjectId, list[int]] = {}
+        self.buffers: dict[str, list[dict[str, Any]]] = {PROJECTS_COL: [], STEP_PROGRESS_COL: [], REMINDERS_COL: []}
+        # Embedded-storage projects still waiting in the buffer take their steps
+        # directly; steps arriving after the flush become $set updates instead.
+        self.pending: dict[ObjectId, dict[str, Any]] = {}
+        self.updates: list[UpdateOne] = []
+        self.counts = {"projects": 0, "step_progress": 0, "reminders": 0, "skipped": 0, "errors": 0}
+
+    async def _flush(self, col: str) -> None:
+        docs = self.buffers[col]
+        if not docs:
+            return
+        self.buffers[col] = []
+        if col == PROJECTS_COL:
+            self.pending.clear()
+        try:
+            res = await self.db[col].insert_many(docs, ordered=False)
+            inserted = len(res.inserted_ids)
+        except BulkWriteError as e:
+            inserted = e.details.get("nInserted", 0)
+            self.counts["errors"] += len(e.details.get("writeErrors", []))
+        key = {PROJECTS_COL: "projects", STEP_PROGRESS_COL: "step_progress", REMINDERS_COL: "reminders"}[col]
+        self.counts[key] += inserted
+
+    async def _add(self, col: str, doc: dict[str, Any]) -> None:
+        self.buffers[col].append(doc)
+        if len(self.buffers[col]) >= self.chunk_size:
+            await self._flush(col)
+
+    async def _flush_updates(self) -> None:
+        ops, self.updates = self.updates, []
+        if ops:
+            await self.db[PROJECTS_COL].bulk_write(ops, ordered=False)
+
+    async def _update(self, op: UpdateOne) -> None:
+        self.updates.append(op)
+        if len(self.updates) >= self.chunk_size:
+            await self._flush_updates()
+
+    async def _add_embedded_step(self, oid: ObjectId, step: dict[str, Any]) -> None:
+        key = str(step.pop("step_number"))
+        if oid in self.pending:
+            self.pending[oid]["steps"][key] = step
+        else:
+            await self._update(UpdateOne({"_id": oid}, {"$set": {f"steps.{key}": step}}))
+        self.counts["step_progress"] += 1
+
+    def _project_oid(self, data: dict[str, Any]) -> ObjectId | None:
+        oid = self.project_ids.get(str(data.get("project_id")))
+        if oid is None:
+            self.counts["skipped"] += 1
+        return oid
+
+    async def add_line(self, kind: str, data: dict[str, Any]) -> None:
+        now = utcnow()
+        if kind == "meta":
+            if data.get("format") != EXPORT_FORMAT_VERSION:
+                raise TransferError(f"unsupported export format {data.get('format')!r}")
+        elif kind == "project":
+            oid = ObjectId()
+            self.project_ids[str(data["id"])] = oid
+            self.progress[oid] = [0, 0]
+            doc = _parse_datetimes(_pick(data, PROJECT_FIELDS))
+            project = {
+                "_id": oid,
+                "user_id": self.user_id,
+                "name": str(doc.get("name") or "Imported project")[:80],
+                "description": str(doc.get("description") or "")[:600],
+                "template": str(doc.get("template") or DEFAULT_TEMPLATE)[:64],
+                "template_version": str(doc.get("template_version") or "")[:64] or None,
+                "overall_progress": 0,
+                "progress_sum": 0,
+                "progress_count": 0,
+                "version": 1,
+                "created_at": doc.get("created_at") or now,
+                "updated_at": doc.get("updated_at") or now,
+            }
+            if self.embedded:
+                project.update(storage=EMBEDDED_STORAGE, steps={})
+                self.pending[oid] = project
+            await self._add(PROJECTS_COL, project)
+        elif kind == "step_progress":
+            oid = self._project_oid(data)
+            if oid is None:
+                return
+            doc = _parse_datetimes(_pick(data, STEP_FIELDS))
+            doc["step_number"] = int(data["step_number"])
+            doc["progress_percent"] = max(0, min(100, int(doc.get("progress_percent") or 0)))
+            if doc.get("status") not in STEP_STATUSES:
+                doc["status"] = "not_started"
+            doc.update(encode_notes(str(doc.get("notes") or "")[:8000]))
+            totals = self.progress[oid]
+            totals[0] += doc["progress_percent"]
+            totals[1] += 1
+            if self.embedded:
+                await self._add_embedded_step(oid, doc)
+            else:
+                await self._add(STEP_PROGRESS_COL, {**doc, "project_id": oid, "user_id": self.user_id})
+        elif kind == "reminder":
+            oid = self._project_oid(data)
+            if oid is None:
+                return
+            doc = _parse_datetimes(_pick(data, REMINDER_FIELDS))
+            doc["step_number"] = int(data["step_number"])
+            doc["remind_at"] = doc.get("remind_at") or now
+            doc["message"] = str(doc.get("message") or "")[:300]
+            doc["sent"] = bool(doc.get("sent", False))
+            doc.setdefault("created_at", now)
+            await self._add(REMINDERS_COL, {**doc, "_id": ObjectId(), "project_id": oid, "user_id": self.user_id})
+        else:
+            self.counts["skipped"] += 1
+
+    async def finish(self) -> dict[str, int]:
+        for col in self.buffers:
+            await self._flush(col)
+        # Counters are set once at the end from the steps actually seen.
+        for oid, (total, count) in self.progress.items():
+            await self._update(
+                UpdateOne(
+                    {"_id": oid},
+                    {
+                        "$set": {
+                            "progress_sum": total,
+                            "progress_count": count,
+                            "overall_progress": int(total / max(1, count) + 0.5),
+                        }
+                    },
+                )
+            )
+        await self._flush_updates()
+        await rollups.mark_stale(self.db, self.user_id)
+        # Imported documents keep their original timestamps, so delta sync
+        # cannot see them; clients start over from a full fetch instead.
+        await record_reset(self.db, self.user_id)
+        return self.counts
+
+
+async def import_user_data(
+    db: AsyncIOMotorDatabase, user_id: str, body: AsyncIterable[bytes], chunk_size: int = 500
+) -> dict[str, int]:
+    importer = _Importer(db, user_id, chunk_size)
+    lineno = 0
+    try:
+        async for line in _lines(body):
+            lineno += 1
+            try:
+                record = json.loads(line)
+                await importer.add_line(record["type"], record.get("data") or {})
+            except TransferError:
+                raise
+            except (ValueError, KeyError, TypeError) as e:
+                raise TransferError(f"line {lineno}: {e}") from e
+    except Exception as e:
+        # Earlier chunks are already written. The lines read so far are finished
+        # like a complete import, so those projects get their counters, the
+        # rollups are rebuilt and sync clients see the reset.
+        imported = await importer.finish()
+        if isinstance(e, TransferError):
+            e.imported = imported
+        raise
+    return await importer.finish()
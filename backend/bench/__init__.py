@@ -0,0 +1 @@
+__all__ = ["mongo", "report", "workload", "micro"]
@@ -0,0 +1,68 @@
+import argparse
+import sys
+from pathlib import Path
+
+from bench.micro import run_micro
+from bench.report import compare, format_table, load_json, write_json
+from bench.workload import DEFAULT_MIX, WorkloadConfig, run_workload
+
+
+def _mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="VibeTracker API benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the workload (and micro-benchmarks) and write a result file")
+    run.add_argument("--requests", type=int, default=2000)
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--users", type=int, default=8)
+    run.add_argument("--projects-per-user", type=int, default=5)
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--mix", type=_mix, default=None, help="e.g. list_projects=1,drag_slider=3")
+    run.add_argument("--mongodb-url", default=None, help="use a real MongoDB instead of the in-memory stand-in")
+    run.add_argument("--storage", choices=["documents", "embedded"], default="documents", help="step-progress layout")
+    run.add_argument("--no-micro", action="store_true")
+    run.add_argument("--out", type=Path, default=Path("bench-result.json"))
+
+    cmp = sub.add_parser("compare", help="compare two result files; exits 1 on regression")
+    cmp.add_argument("baseline", type=Path)
+    cmp.add_argument("current", type=Path)
+    cmp.add_argument("--threshold", type=float, default=10.0, help="allowed increase, in percent")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        config = WorkloadConfig(
+            requests=args.requests,
+            concurrency=args.concurrency,
+            users=args.users,
+            projects_per_user=args.projects_per_user,
+            seed=args.seed,
+            mongodb_url=args.mongodb_url,
+            storage=args.storage,
+        )
+        if args.mix:
+            config.mix = args.mix
+        result = run_workload(config)
+        if not args.no_micro:
+            result["micro"] = run_micro()
+        write_json(result, args.out)
+        print(format_table(result))
+        print(f"\nwrote {args.out}")
+        return 0
+
+    text, regressed = compare(load_json(args.baseline), load_json(args.current), args.threshold)
+    print(text)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import time
+import timeit
+from datetime import datetime
+from typing import Any, Callable
+
+from bson import ObjectId
+
+from app.api.encoding import json_bytes, model_response
+from app.auth.token_cache import TokenCache
+from app.models.projects import StepProgressOut
+from app.routes.projects import _normalize_progress
+from app.services.steps import get_steps_catalog
+
+
+def _progress_docs() -> list[dict[str, Any]]:
+    project_id = ObjectId()
+    return [
+        {
+            "_id": ObjectId(),
+            "project_id": project_id,
+            "user_id": "user0",
+            "step_number": n,
+            "status": "in_progress",
+            "progress_percent": n * 3,
+            "notes": "notes " * 40,
+            "completed_at": datetime(2026, 1, 1),
+        }
+        for n in range(1, 34)
+    ]
+
+
+def _benches() -> dict[str, Callable[[], Any]]:
+    cache = TokenCache()
+    cache.put("token", {"uid": "user0", "exp": time.time() + 3600})
+    docs = _progress_docs()
+    normalized = [_normalize_progress(d) for d in docs]
+    project = {
+        "id": str(ObjectId()),
+        "user_id": "user0",
+        "name": "Project",
+        "description": "",
+        "overall_progress": 40,
+        "created_at": datetime(2026, 1, 1),
+        "updated_at": datetime(2026, 1, 2),
+    }
+    catalog = get_steps_catalog()
+    return {
+        "token_cache_hit": lambda: cache.get("token"),
+        "normalize_progress_x33": lambda: [_normalize_progress(d) for d in docs],
+        "encode_progress_x33": lambda: json_bytes(normalized),
+        "encode_project_view": lambda: b"".join(
+            [json_bytes(project), catalog.body, json_bytes(normalized)]
+        ),
+        "respond_steps_x33": lambda: model_response(StepProgressOut, normalized),
+    }
+
+
+def run_micro(min_time: float = 0.2) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, fn in _benches().items():
+        timer = timeit.Timer(fn)
+        number, _ = timer.autorange()
+        number = max(number, int(number * min_time / 0.2))
+        best = min(timer.repeat(repeat=5, number=number)) / number
+        results[name] = {"us_per_op": round(best * 1e6, 3), "loops": number}
+    return results
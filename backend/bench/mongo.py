@@ -0,0 +1,102 @@
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+# Name of the operation currently being measured; round-trips are booked against it.
+current_op: ContextVar[str] = ContextVar("bench_current_op", default="(none)")
+
+# Collection methods that cost one server round-trip when called. Cursor-returning
+# methods (find, aggregate) are counted once when created, which holds as long as
+# results fit in the first batch - true for every query the API issues.
+ROUND_TRIP_METHODS = {
+    "find",
+    "find_one",
+    "find_one_and_update",
+    "find_one_and_delete",
+    "find_one_and_replace",
+    "aggregate",
+    "count_documents",
+    "insert_one",
+    "insert_many",
+    "update_one",
+    "update_many",
+    "replace_one",
+    "delete_one",
+    "delete_many",
+    "bulk_write",
+    "create_index",
+    "distinct",
+}
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.by_op: dict[str, int] = defaultdict(int)
+        self.by_collection: dict[str, int] = defaultdict(int)
+
+    def record(self, collection: str) -> None:
+        self.by_op[current_op.get()] += 1
+        self.by_collection[collection] += 1
+
+    def reset(self) -> None:
+        self.by_op.clear()
+        self.by_collection.clear()
+
+
+class CountingCollection:
+    def __init__(self, col: Any, counter: RoundTripCounter):
+        self._col = col
+        self._counter = counter
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._col, name)
+        if name not in ROUND_TRIP_METHODS or not callable(attr):
+            return attr
+
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            self._counter.record(self._col.name)
+            return attr(*args, **kwargs)
+
+        return counted
+
+    @property
+    def name(self) -> str:
+        return self._col.name
+
+
+class CountingDatabase:
+    def __init__(self, db: Any, counter: RoundTripCounter):
+        self._db = db
+        self.counter = counter
+
+    def __getitem__(self, name: str) -> CountingCollection:
+        return CountingCollection(self._db[name], self.counter)
+
+    def get_collection(self, name: str, **kwargs: Any) -> CountingCollection:
+        return CountingCollection(self._db.get_collection(name, **kwargs), self.counter)
+
+    def with_options(self, **kwargs: Any) -> "CountingDatabase":
+        return CountingDatabase(self._db.with_options(**kwargs), self.counter)
+
+    async def command(self, *args: Any, **kwargs: Any) -> Any:
+        self.counter.record("$cmd")
+        return await self._db.command(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._db, name)
+
+
+def standin_database(name: str = "vibe_bench") -> AsyncIOMotorDatabase:
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError as e:
+        raise RuntimeError("the Mongo stand-in needs mongomock-motor (uv sync --group bench)") from e
+    return AsyncMongoMockClient()[name]
+
+
+def real_database(url: str, name: str = "vibe_bench") -> AsyncIOMotorDatabase:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    return AsyncIOMotorClient(url)[name]
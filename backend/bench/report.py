@@ -0,0 +1,115 @@
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Linear interpolation between closest ranks, same as numpy's default.
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    if lo == hi:
+        return sorted_values[lo]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(latencies_ms: list[float], elapsed_s: float, round_trips: int, errors: int = 0) -> dict[str, Any]:
+    values = sorted(latencies_ms)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed_s, 2) if elapsed_s else 0.0,
+        "mean_ms": round(sum(values) / count, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+        "mongo_round_trips_per_req": round(round_trips / count, 2) if count else 0.0,
+    }
+
+
+def git_revision(cwd: Path | None = None) -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(config: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+    }
+
+
+def write_json(result: dict[str, Any], path: Path) -> None:
+    path.write_text(json.dumps(result, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_json(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def format_table(result: dict[str, Any]) -> str:
+    header = f'{"operation":<18}{"count":>7}{"rps":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"rt/req":>8}'
+    lines = [header, "-" * len(header)]
+    for op, s in sorted(result["operations"].items()):
+        lines.append(
+            f'{op:<18}{s["count"]:>7}{s["throughput_rps"]:>10.1f}{s["p50_ms"]:>10.2f}'
+            f'{s["p95_ms"]:>10.2f}{s["p99_ms"]:>10.2f}{s["mongo_round_trips_per_req"]:>8.2f}'
+        )
+    t = result["total"]
+    lines.append("-" * len(header))
+    lines.append(
+        f'{"total":<18}{t["count"]:>7}{t["throughput_rps"]:>10.1f}{t["p50_ms"]:>10.2f}'
+        f'{t["p95_ms"]:>10.2f}{t["p99_ms"]:>10.2f}{t["mongo_round_trips_per_req"]:>8.2f}'
+    )
+    for name, m in sorted(result.get("micro", {}).items()):
+        lines.append(f'micro {name:<30}{m["us_per_op"]:>10.2f} us/op')
+    return "\n".join(lines)
+
+
+# Metrics where a higher value is a regression, compared as relative change.
+_COMPARED = ("p50_ms", "p95_ms", "p99_ms", "mongo_round_trips_per_req")
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold_pct: float) -> tuple[str, bool]:
+    lines = [f'baseline {baseline["meta"].get("revision")} -> current {current["meta"].get("revision")}']
+    regressed = False
+    rows = [(op, baseline["operations"].get(op), s) for op, s in sorted(current["operations"].items())]
+    rows.append(("total", baseline["total"], current["total"]))
+    for op, before, after in rows:
+        if before is None:
+            lines.append(f"{op:<18} (new)")
+            continue
+        cells = []
+        for metric in _COMPARED:
+            b, a = before[metric], after[metric]
+            change = ((a - b) / b * 100) if b else (0.0 if a == b else math.inf)
+            flag = ""
+            if change > threshold_pct:
+                flag = " !"
+                regressed = True
+            cells.append(f"{metric}={a:g} ({change:+.1f}%){flag}")
+        lines.append(f"{op:<18} " + "  ".join(cells))
+    for name, after in sorted(current.get("micro", {}).items()):
+        before = baseline.get("micro", {}).get(name)
+        if before is None:
+            continue
+        change = (after["us_per_op"] - before["us_per_op"]) / before["us_per_op"] * 100
+        flag = " !" if change > threshold_pct else ""
+        regressed = regressed or bool(flag)
+        lines.append(f'micro {name:<30} {after["us_per_op"]:.2f} us/op ({change:+.1f}%){flag}')
+    return "\n".join(lines), regressed
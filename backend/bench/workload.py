@@ -0,0 +1,162 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import httpx
+
+import app.api.deps as deps
+from app.core.config import settings
+from app.main import create_app
+from app.services.projects import ensure_indexes
+from bench.mongo import CountingDatabase, RoundTripCounter, current_op, real_database, standin_database
+from bench.report import metadata, summarize
+
+# Relative weights of the scripted operations; mirrors what the web client does
+# on a dashboard visit followed by work inside one project.
+DEFAULT_MIX = {
+    "list_projects": 25,
+    "open_project": 25,
+    "drag_slider": 40,
+    "create_reminder": 10,
+}
+
+
+@dataclass
+class WorkloadConfig:
+    requests: int = 2000
+    concurrency: int = 16
+    users: int = 8
+    projects_per_user: int = 5
+    seed: int = 1
+    mix: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    mongodb_url: str | None = None
+    # Step-progress layout for the seeded projects: "documents" or "embedded".
+    storage: str = "documents"
+
+
+def _stub_verify(token: str) -> dict:
+    # Tokens are "bench-<uid>"; no signature check, no Firebase.
+    if not token.startswith("bench-"):
+        raise ValueError("not a bench token")
+    uid = token[len("bench-") :]
+    return {"uid": uid, "email": f"{uid}@bench.local", "name": uid}
+
+
+class Workload:
+    def __init__(self, config: WorkloadConfig):
+        self.config = config
+        self.counter = RoundTripCounter()
+        base = real_database(config.mongodb_url) if config.mongodb_url else standin_database()
+        self.db = CountingDatabase(base, self.counter)
+        self.app = create_app()
+        self.app.dependency_overrides[deps.db_dep] = lambda: self.db
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.projects: dict[str, list[str]] = {}
+
+    def _headers(self, uid: str) -> dict[str, str]:
+        return {"Authorization": f"Bearer bench-{uid}"}
+
+    async def _request(self, client: httpx.AsyncClient, op: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        token = current_op.set(op)
+        try:
+            started = time.perf_counter()
+            res = await client.request(method, url, **kwargs)
+            self.latencies[op].append((time.perf_counter() - started) * 1000)
+        finally:
+            current_op.reset(token)
+        if res.status_code >= 400:
+            self.errors[op] += 1
+        return res
+
+    async def _seed(self, client: httpx.AsyncClient) -> None:
+        token = current_op.set("setup")
+        try:
+            await ensure_indexes(self.db)
+            for u in range(self.config.users):
+                uid = f"user{u}"
+                ids = []
+                for p in range(self.config.projects_per_user):
+                    res = await client.post(
+                        "/api/projects", json={"name": f"Project {p}"}, headers=self._headers(uid)
+                    )
+                    res.raise_for_status()
+                    ids.append(res.json()["id"])
+                self.projects[uid] = ids
+        finally:
+            current_op.reset(token)
+
+    async def _run_op(self, client: httpx.AsyncClient, rng: random.Random, op: str) -> None:
+        uid = rng.choice(sorted(self.projects))
+        headers = self._headers(uid)
+        project_id = rng.choice(self.projects[uid])
+        if op == "list_projects":
+            await self._request(client, op, "GET", "/api/projects?limit=50", headers=headers)
+        elif op == "open_project":
+            await self._request(client, op, "GET", f"/api/projects/{project_id}", headers=headers)
+        elif op == "drag_slider":
+            step = rng.randint(1, 33)
+            body = {"progress_percent": rng.randint(0, 100)}
+            await self._request(client, op, "PUT", f"/api/projects/{project_id}/steps/{step}", json=body, headers=headers)
+        elif op == "create_reminder":
+            remind_at = datetime.now(timezone.utc) + timedelta(days=rng.randint(1, 30))
+            await self._request(
+                client,
+                op,
+                "POST",
+                "/api/reminders",
+                params={"project_id": project_id, "step_number": rng.randint(1, 33)},
+                json={"remind_at": remind_at.isoformat(), "message": "bench reminder"},
+                headers=headers,
+            )
+        else:
+            raise ValueError(f"unknown operation {op!r}")
+
+    async def _worker(self, client: httpx.AsyncClient, index: int, n: int) -> None:
+        rng = random.Random(self.config.seed * 1000 + index)
+        ops, weights = zip(*sorted(self.config.mix.items()))
+        for _ in range(n):
+            await self._run_op(client, rng, rng.choices(ops, weights)[0])
+
+    async def run(self) -> dict[str, Any]:
+        original_verify = deps.verify_bearer_token
+        original_storage = settings.project_storage
+        deps.verify_bearer_token = _stub_verify
+        settings.project_storage = self.config.storage
+        try:
+            transport = httpx.ASGITransport(app=self.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                await self._seed(client)
+                self.counter.reset()
+                c = self.config.concurrency
+                shares = [self.config.requests // c + (1 if i < self.config.requests % c else 0) for i in range(c)]
+                started = time.perf_counter()
+                await asyncio.gather(*(self._worker(client, i, n) for i, n in enumerate(shares)))
+                elapsed = time.perf_counter() - started
+        finally:
+            deps.verify_bearer_token = original_verify
+            settings.project_storage = original_storage
+
+        operations = {
+            op: summarize(lat, elapsed, self.counter.by_op.get(op, 0), self.errors.get(op, 0))
+            for op, lat in self.latencies.items()
+        }
+        all_latencies = [v for lat in self.latencies.values() for v in lat]
+        total = summarize(all_latencies, elapsed, sum(self.counter.by_op.values()), sum(self.errors.values()))
+        config = asdict(self.config)
+        config["mongo"] = "real" if self.config.mongodb_url else "standin"
+        config.pop("mongodb_url")
+        return {
+            "meta": metadata(config),
+            "operations": operations,
+            "total": total,
+            "round_trips_by_collection": dict(self.counter.by_collection),
+        }
+
+
+def run_workload(config: WorkloadConfig) -> dict[str, Any]:
+    return asyncio.run(Workload(config).run())
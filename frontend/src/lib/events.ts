@@ -0,0 +1,43 @@
+import type { User } from "firebase/auth";
+import { API_BASE_URL, apiFetch } from "./api";
+
+export type EventHandlers = Record<string, (data: any) => void>;
+
+// EventSource cannot send an Authorization header, so each connection opens with
+// a single-use ticket fetched just before. A ticket is spent once used, so when
+// the stream closes for good (its own reconnect is refused) it is reopened with
+// a fresh one.
+export function subscribeEvents(user: User, handlers: EventHandlers): () => void {
+  let source: EventSource | null = null;
+  let retry: ReturnType<typeof setTimeout> | undefined;
+  let closed = false;
+
+  function reopen() {
+    if (!closed) retry = setTimeout(() => void open(), 3000);
+  }
+
+  async function open() {
+    let ticket: string;
+    try {
+      ({ ticket } = await apiFetch<{ ticket: string }>("/api/events/ticket", { method: "POST", user }));
+    } catch {
+      reopen();
+      return;
+    }
+    if (closed) return;
+    source = new EventSource(`${API_BASE_URL}/api/events?ticket=${encodeURIComponent(ticket)}`);
+    for (const [type, handle] of Object.entries(handlers)) {
+      source.addEventListener(type, (e) => handle(JSON.parse((e as MessageEvent).data)));
+    }
+    source.onerror = () => {
+      if (source?.readyState === EventSource.CLOSED) reopen();
+    };
+  }
+
+  void open();
+  return () => {
+    closed = true;
+    clearTimeout(retry);
+    source?.close();
+  };
+}
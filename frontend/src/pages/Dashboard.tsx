@@ -4,6 +4,7 @@ import { Button } from "../components/ui/Button";
 import { ProjectCard } from "../components/dashboard/ProjectCard";
 import { useAuth } from "../hooks/useAuth";
 import { apiFetch } from "../lib/api";
+import { subscribeEvents } from "../lib/events";
 import { useProjectStore } from "../store/projectStore";
 import type { Project } from "../types/models";
 
@@ -49,6 +50,34 @@ export function DashboardPage() {
     };
   }, [user, setProjects]);
 
+  useEffect(() => {
+    if (!user) return;
+    // Progress made in another tab or device updates the cards in place.
+    const apply = (data: Partial<Project> & { project_id: string }) => {
+      const current = useProjectStore.getState().projects;
+      setProjects(
+        current.map((p) =>
+          p.id === data.project_id
+            ? {
+                ...p,
+                name: data.name ?? p.name,
+                description: data.description ?? p.description,
+                overall_progress: data.overall_progress ?? p.overall_progress,
+                updated_at: data.updated_at ?? p.updated_at
+              }
+            : p
+        )
+      );
+    };
+    return subscribeEvents(user, {
+      project: apply,
+      progress: apply,
+      resync: () => {
+        void apiFetch<Project[]>("/api/projects", { user }).then(setProjects).catch(() => undefined);
+      }
+    });
+  }, [user, setProjects]);
+
   async function enableNotifications() {
     if (typeof Notification === "undefined") {
       setNotifStatus("unsupported");
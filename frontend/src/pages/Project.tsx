@@ -66,7 +66,13 @@ export function ProjectPage() {
       });
       setData((prev) => {
         if (!prev) return prev;
-        return { ...prev, progress: prev.progress.map((p) => (p.step_number === stepNumber ? updated : p)) };
+        // Step writes don't echo reminders back; keep the ones already loaded.
+        return {
+          ...prev,
+          progress: prev.progress.map((p) =>
+            p.step_number === stepNumber ? { ...updated, reminders: p.reminders || [] } : p
+          )
+        };
       });
     } catch (e: any) {
       setError(e?.message || "Failed to update step");